@@ -3,14 +3,50 @@ News Collector Agent
 Responsible for fetching and processing RSS feeds from tech news sources.
 """
 
+import asyncio
 import logging
+import multiprocessing
+import operator
+import time
 import feedparser
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
+from typing import AsyncIterator, Iterable, List, Dict, Optional
+from config import PRIORITY_COMPANIES
+from utils.article import Article
+from utils.article_store import ArticleStore
+from utils.dedup import DedupIndex
+from utils.feed_cache import FeedCache, compact_feed, expand_feed
+from utils.feed_health import FeedHealth
+from utils.feed_scheduler import CHANNEL_HINT_FIELDS, FeedScheduler
+from utils.http_client import create_http_client, get_url
+from utils.rate_limit import HostRateLimiter
 from utils.retry import retry_on_network_error
+from utils.source_index import SourceIndex
+from utils.text_cleaner import clean_summary
+from utils.time_index import TimeWindowIndex
+from utils.timestamps import CHANNEL_DATE_FIELDS, TimestampNormalizer
+from utils.topk import TopKSelector
 
 logger = logging.getLogger(__name__)
 
+by_timestamp = operator.attrgetter("timestamp")
+
+# Feed priority classes, highest first
+PRIORITY_CLASSES = ("high", "normal", "low")
+
+
+def parse_feed_compact(data: bytes, response_headers: Dict[str, str]) -> Dict:
+    """Parse raw feed bytes and keep only the fields the collector reads.
+
+    Runs in a worker process, so it returns small plain dicts instead of full
+    FeedParserDict objects to keep the pickling cost low: the entry fields, plus the
+    channel-level polling hints used by the feed scheduler and the channel dates used for
+    undated entries.
+    """
+    feed = feedparser.parse(data, response_headers=response_headers)
+    return compact_feed(feed, CHANNEL_HINT_FIELDS + CHANNEL_DATE_FIELDS)
+
 
 class NewsCollectorAgent:
     """Agent responsible for collecting news from RSS feeds."""
@@ -18,85 +54,461 @@ class NewsCollectorAgent:
     def __init__(self, rss_feeds: Dict[str, str], config: Dict):
         self.rss_feeds = rss_feeds
         self.config = config
+        self.source_index = SourceIndex(
+            companies=config.get("priority_companies", PRIORITY_COMPANIES)
+        )
         self.collected_articles = []
+        self.dedup_index = DedupIndex()
+        self._selector = TopKSelector(
+            config["max_articles"], config.get("max_per_source"), key=by_timestamp
+        )
+        self.cut_off_feeds: List[str] = []
+        self.skipped_feeds: List[str] = []
+        self._date_fields: Dict[str, str] = {}
+        cache_path = config.get("feed_cache_path")
+        self.feed_cache = FeedCache(cache_path) if cache_path else None
+        scheduler_path = config.get("scheduler_path")
+        self.feed_scheduler = (
+            FeedScheduler(
+                scheduler_path,
+                min_interval=config.get("min_poll_interval", 900),
+                max_interval=config.get("max_poll_interval", 86400),
+            )
+            if config.get("adaptive_polling") and scheduler_path
+            else None
+        )
+        health_path = config.get("feed_health_path")
+        self.feed_health = (
+            FeedHealth(
+                health_path,
+                failure_threshold=config.get("breaker_threshold", 3),
+                cooldown=config.get("breaker_cooldown", 6 * 3600),
+            )
+            if health_path
+            else None
+        )
+        store_path = config.get("article_store_path")
+        self.article_store = ArticleStore(store_path) if store_path else None
+        self.history = TimeWindowIndex()
+        if self.article_store is not None:
+            since = datetime.now(timezone.utc) - timedelta(hours=config.get("history_hours", 720))
+            # Ascending order makes every insert an append to the sorted arrays
+            for article in self.article_store.query(since, oldest_first=True):
+                self.history.add(article)
+        self.http_client = None
+        self.rate_limiter = HostRateLimiter(
+            rate=config.get("host_rate", 0),
+            burst=config.get("host_burst", 1),
+            max_in_flight=config.get("per_host_connections", 4),
+        )
+        self._parse_pool = None
+
+    def _get_http_client(self):
+        """Get or initialize the pooled HTTP client (lazy loading)."""
+        if self.http_client is None:
+            self.http_client = create_http_client(
+                max_connections=self.config.get("fetch_concurrency", 8),
+                timeout=self.config.get("feed_timeout", 30),
+            )
+        return self.http_client
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client and parsing process pool, if they were started."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Get or start the feed parsing process pool (lazy loading)."""
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.config["parse_workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._parse_pool
+
+    async def _parse_feed_bytes(self, data: bytes, headers: Dict[str, str]):
+        """Parse downloaded feed bytes off the event loop.
+
+        With ``parse_workers`` set, parsing runs in a process pool so CPU-bound feedparser
+        work scales across cores; otherwise it runs in a worker thread.
+        """
+        if not self.config.get("parse_workers"):
+            return await asyncio.to_thread(feedparser.parse, data, response_headers=headers)
+
+        loop = asyncio.get_running_loop()
+        compact = await loop.run_in_executor(
+            self._get_parse_pool(), parse_feed_compact, data, headers
+        )
+        return expand_feed(compact, headers=headers)
 
     @retry_on_network_error()
     def _fetch_feed(self, url: str) -> feedparser.FeedParserDict:
-        """Fetch RSS feed with retry logic."""
-        return feedparser.parse(url)
+        """Fetch RSS feed with retry logic.
 
-    async def collect_news(self) -> List[Dict]:
-        """Collect news articles from RSS feeds."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.config["hours_back"])
+        When the feed cache is enabled, sends the stored ETag / Last-Modified validators
+        and reuses the cached entries if the server answers 304 Not Modified.
+        """
+        if self.feed_cache is None:
+            return feedparser.parse(url)
+
+        feed = feedparser.parse(url, **self.feed_cache.validators(url))
+        if feed.get("status") == 304:
+            cached = self.feed_cache.cached_feed(url)
+            if cached is not None:
+                logger.debug(f"Feed not modified, using cached entries: {url}")
+                return cached
+        self.feed_cache.store(url, feed)
+        return feed
+
+    @retry_on_network_error()
+    async def _download_feed(self, url: str) -> feedparser.FeedParserDict:
+        """Download a feed with the pooled HTTP client and parse the raw bytes.
+
+        Conditional GET validators from the feed cache are sent as If-None-Match /
+        If-Modified-Since.
+        """
+        client = self._get_http_client()
+        headers = {}
+        if self.feed_cache is not None:
+            validators = self.feed_cache.validators(url)
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "modified" in validators:
+                headers["If-Modified-Since"] = validators["modified"]
+
+        response = await get_url(client, url, headers)
+
+        if response.status_code == 304 and self.feed_cache is not None:
+            cached = self.feed_cache.cached_feed(url)
+            if cached is not None:
+                logger.debug(f"Feed not modified, using cached entries: {url}")
+                return cached
+        response.raise_for_status()
+
+        feed = await self._parse_feed_bytes(response.content, dict(response.headers))
+        feed["status"] = response.status_code
+        feed["etag"] = response.headers.get("etag")
+        feed["modified"] = response.headers.get("last-modified")
+        if self.feed_cache is not None:
+            self.feed_cache.store(url, feed)
+        return feed
+
+    async def _fetch_url(self, url: str) -> feedparser.FeedParserDict:
+        """Fetch a feed using whichever fetch path is enabled.
+
+        Uses the pooled HTTP client when ``pooled_http`` is enabled, otherwise runs
+        feedparser's own blocking fetch in a worker thread.
+        """
+        if self.config.get("pooled_http"):
+            return await self._download_feed(url)
+        return await asyncio.to_thread(self._fetch_feed, url)
+
+    async def _fetch_source(
+        self, source: str, url: str, semaphore: asyncio.Semaphore, deadline: float
+    ):
+        """Fetch a single feed within its ``feed_timeout`` and deadline share.
+
+        Waits for the host's rate-limit token before taking a ``fetch_concurrency`` slot.
+        Honors ``adaptive_polling`` (serving feeds that are not due from the cache) and
+        the feed health circuit breaker.
+
+        Returns:
+            Tuple of (source, feed), where feed is None if the fetch failed, timed out or
+            was skipped
+        """
+        if self.feed_scheduler is not None and not self.feed_scheduler.is_due(url):
+            cached = self.feed_cache.cached_feed(url) if self.feed_cache is not None else None
+            if cached is not None:
+                logger.debug(f"Skipping {source}, not due for polling yet")
+                return source, cached
+
+        if self.feed_health is not None and not self.feed_health.allow(url):
+            logger.info(f"Skipping {source}, circuit open after repeated failures")
+            self.skipped_feeds.append(source)
+            return source, None
+
+        loop = asyncio.get_running_loop()
+        timeout = None
+        try:
+            async with self.rate_limiter.limit(url), semaphore:
+                started = loop.time()
+                if deadline <= started:
+                    # Budget spent while queued: the feed was never contacted, so this is
+                    # not a health failure
+                    logger.warning(f"Cut off {source} before fetching, deadline share used up")
+                    self.cut_off_feeds.append(source)
+                    return source, None
+                timeout = min(self.config.get("feed_timeout", 30), deadline - started)
+                feed = await asyncio.wait_for(self._fetch_url(url), timeout)
+            if self.feed_health is not None:
+                if feed.get("status", 200) >= 400 or (feed.get("bozo") and not feed.entries):
+                    raise ConnectionError(
+                        feed.get("bozo_exception") or f"HTTP {feed.get('status')}"
+                    )
+                self.feed_health.record_success(url, loop.time() - started)
+            if self.feed_scheduler is not None:
+                self.feed_scheduler.record(url, feed)
+            return source, feed
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out fetching from {source} after {timeout:.1f}s")
+            self.cut_off_feeds.append(source)
+        except Exception as e:
+            logger.error(f"Error fetching from {source}: {e}")
+        if self.feed_health is not None:
+            self.feed_health.record_failure(url)
+        return source, None
+
+    def _parse_entries(self, source: str, feed, cutoff: datetime) -> List[Article]:
+        """Convert feed entries published after the cutoff into articles.
+
+        Undated entries are stamped just after the cutoff so they rank last. Uses
+        ``summary_max_chars`` and, for newest-first feeds, ``stale_run_limit``.
+        """
         articles = []
+        cutoff_ts = int(cutoff.timestamp())
+        normalize = TimestampNormalizer(feed, self._date_fields.get(source))
+        summary_limit = self.config.get("summary_max_chars", 500)
+        stale_run_limit = self.config.get("stale_run_limit", 3)
+        stale_run = 0
+        ordered = True
+        previous = None
+
+        for entry in feed.entries:
+            try:
+                timestamp = normalize(entry)
+                if timestamp is not None:
+                    if previous is not None and timestamp > previous:
+                        ordered = False
+                    previous = timestamp
+
+                    if timestamp <= cutoff_ts:
+                        stale_run += 1
+                        if ordered and stale_run_limit and stale_run >= stale_run_limit:
+                            logger.debug(f"Stopped parsing {source} after {stale_run} old entries")
+                            break
+                        continue
+                    stale_run = 0
+                else:
+                    timestamp = cutoff_ts + 1
+
+                articles.append(
+                    Article(
+                        source=source,
+                        title=entry.title,
+                        link=entry.link,
+                        published=timestamp,
+                        summary=clean_summary(getattr(entry, "summary", ""), summary_limit),
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Error parsing entry from {source}: {e}")
+
+        if normalize.field is not None:
+            self._date_fields[source] = normalize.field
+        return articles
+
+    def feed_priority(self, source: str) -> str:
+        """Return the priority class of a feed ("high", "normal" or "low")."""
+        priority = self.config.get("feed_priorities", {}).get(source, "normal")
+        return priority if priority in PRIORITY_CLASSES else "normal"
+
+    def _priority_rank(self, source: str) -> int:
+        return PRIORITY_CLASSES.index(self.feed_priority(source))
+
+    async def collect_news_iter(self) -> AsyncIterator[Article]:
+        """Collect news articles from RSS feeds, yielding them as each feed completes.
+
+        Cross-feed duplicates are dropped, and in ``incremental`` mode so are articles
+        emitted in an earlier run. Feeds go out in ``feed_priorities`` order within their
+        ``deadline_shares`` of ``collection_deadline``; feeds that miss it are listed in
+        ``cut_off_feeds``. ``current_top()`` shows the running ``max_articles`` newest.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.config["hours_back"])
+        self._selector = TopKSelector(
+            self.config["max_articles"], self.config.get("max_per_source"), key=by_timestamp
+        )
+        self.dedup_index = DedupIndex()
+        self.cut_off_feeds = []
+        self.skipped_feeds = []
+        self.rate_limiter.reset_stats()
         days = self.config["hours_back"] // 24
+        total = len(self.rss_feeds)
 
         logger.info(
-            f"Starting collection from {len(self.rss_feeds)} feeds, "
+            f"Starting collection from {total} feeds, "
             f"looking back {self.config['hours_back']} hours"
         )
         print(f"\n🔍 Collecting articles from the last {days} days...")
 
-        for idx, (source, url) in enumerate(self.rss_feeds.items(), 1):
-            try:
-                print(
-                    f"   [{idx}/{len(self.rss_feeds)}] Fetching from {source}...",
-                    end=" ",
-                    flush=True,
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        budget = self.config.get("collection_deadline") or float("inf")
+        deadline = started + budget
+        shares = self.config.get("deadline_shares", {})
+        semaphore = asyncio.Semaphore(max(1, self.config.get("fetch_concurrency", 8)))
+        # Tasks acquire the semaphore in creation order, so higher priority feeds go first
+        tasks = {}
+        for source in sorted(self.rss_feeds, key=self._priority_rank):
+            feed_deadline = started + budget * shares.get(self.feed_priority(source), 1.0)
+            fetch = self._fetch_source(source, self.rss_feeds[source], semaphore, feed_deadline)
+            tasks[asyncio.ensure_future(fetch)] = source
+
+        pending = set(tasks)
+        idx = 0
+        try:
+            while pending and loop.time() < deadline:
+                remaining = deadline - loop.time()
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if remaining == float("inf") else remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                feed = self._fetch_feed(url)
-                print(f"✓ ({len(feed.entries)} entries)")
-                logger.debug(f"Fetched {len(feed.entries)} entries from {source}")
-
-                for entry in feed.entries:
-                    try:
-                        published = (
-                            datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                            if hasattr(entry, "published_parsed") and entry.published_parsed
-                            else datetime.now(timezone.utc)
-                        )
-
-                        if published > cutoff:
-                            articles.append(
-                                {
-                                    "source": source,
-                                    "title": entry.title,
-                                    "link": entry.link,
-                                    "published": published,
-                                    "summary": getattr(entry, "summary", ""),
-                                }
-                            )
-                    except Exception as e:
-                        logger.warning(f"Error parsing entry from {source}: {e}")
-            except Exception as e:
-                print("✗ Error")
-                logger.error(f"Error fetching from {source}: {e}")
+                for task in done:
+                    idx += 1
+                    source, feed = task.result()
+                    if feed is None:
+                        reason = "circuit open" if source in self.skipped_feeds else "error"
+                        print(f"   [{idx}/{total}] ✗ {source} ({reason})")
+                        continue
 
-        self.collected_articles = sorted(articles, key=lambda x: x["published"], reverse=True)[
-            : self.config["max_articles"]
-        ]
+                    print(f"   [{idx}/{total}] ✓ {source} ({len(feed.entries)} entries)")
+                    logger.debug(f"Fetched {len(feed.entries)} entries from {source}")
+                    fresh = [
+                        article
+                        for article in self._parse_entries(source, feed, cutoff)
+                        if self.dedup_index.add(article["link"])
+                    ]
+                    if self.article_store is not None:
+                        new = self.article_store.add_new(fresh)
+                        if self.config.get("incremental"):
+                            fresh = new
+                    for article in fresh:
+                        self.history.add(article)
+                        self._selector.push(article)
+                        yield article
+        finally:
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if loop.time() >= deadline:
+                    self.cut_off_feeds.extend(tasks[task] for task in pending)
+                    logger.warning(
+                        f"Collection deadline reached, {len(pending)} feed(s) cut off: "
+                        f"{', '.join(tasks[task] for task in pending)}"
+                    )
+                    print(f"   ⏱️  Deadline reached, skipped {len(pending)} slow feed(s)")
+
+            throttled = {h: t for h, t in self.rate_limiter.wait_times.items() if t >= 0.01}
+            if throttled:
+                logger.info(
+                    "Per-host throttle wait: "
+                    + ", ".join(f"{host} {wait:.2f}s" for host, wait in throttled.items())
+                )
+
+            if self.article_store is not None:
+                self.article_store.commit()
+            try:
+                if self.feed_cache is not None:
+                    self.feed_cache.save()
+                if self.feed_scheduler is not None:
+                    self.feed_scheduler.save()
+                if self.feed_health is not None:
+                    self.feed_health.save()
+            except OSError as e:
+                logger.warning(f"Could not save feed state: {e}")
+
+    def articles_since(
+        self, hours: float, sources: Optional[Iterable[str]] = None, unemitted: bool = False
+    ) -> List[Article]:
+        """Return collected articles from the last ``hours`` hours, newest first.
+
+        Answered from the in-memory time-window index without refetching. The index holds
+        every article collected in this process plus, with an article store, the last
+        ``history_hours`` of stored history.
+
+        Args:
+            hours: Window size in hours
+            sources: Only include these sources (all sources if None)
+            unemitted: Leave out articles already marked as emitted in the article store
+        """
+        since = int(time.time() - hours * 3600)
+        articles = self.history.query(since, sources)
+        if unemitted and self.article_store is not None:
+            articles = self.article_store.unemitted(articles)
+        return articles
+
+    def current_top(self) -> List[Article]:
+        """Return the newest articles selected so far by the running collection, newest first."""
+        return self._selector.results()
+
+    async def collect_news(self, mark_emitted: bool = True) -> List[Article]:
+        """Collect news articles from RSS feeds.
+
+        Runs ``collect_news_iter`` to completion and keeps the ``max_articles`` newest
+        articles in ``collected_articles``.
+
+        Args:
+            mark_emitted: Record the selected articles as emitted right away. Pass False to
+                call ``mark_emitted`` once they have actually been delivered.
+        """
+        async for _ in self.collect_news_iter():
+            pass
+        self.collected_articles = self.current_top()
+        if mark_emitted:
+            self.mark_emitted()
 
         logger.info(
-            f"Collection completed: {len(self.collected_articles)} articles from "
-            f"{len(set(a['source'] for a in self.collected_articles))} sources"
+            f"Collection completed: {len(self._collected_articles)} articles from "
+            f"{len(self.source_index.counts())} sources "
+            f"({self.dedup_index.duplicates} duplicates dropped)"
         )
-        print(f"✅ Successfully collected {len(self.collected_articles)} articles\n")
+        print(f"✅ Successfully collected {len(self._collected_articles)} articles\n")
         return self.collected_articles
 
+    def mark_emitted(self, articles: Optional[Iterable[Article]] = None) -> None:
+        """Record articles (default: ``collected_articles``) as emitted in the article store.
+
+        In ``incremental`` mode, emitted articles are not returned by later runs; articles
+        that were collected but never emitted stay eligible.
+        """
+        if self.article_store is None:
+            return
+        self.article_store.mark_emitted(self._collected_articles if articles is None else articles)
+        self.article_store.commit()
+
+    @property
+    def collected_articles(self) -> List[Article]:
+        """Articles from the last completed collection, newest first.
+
+        Returns a copy, so the source index can only change through the setter; assign a
+        new list to replace the collection.
+        """
+        return list(self._collected_articles)
+
+    @collected_articles.setter
+    def collected_articles(self, articles: List[Article]) -> None:
+        """Replace the collection and rebuild the source index from it."""
+        self._collected_articles = list(articles)
+        self.source_index.clear()
+        for article in self._collected_articles:
+            self.source_index.add(article)
+
     def _group_by_source(self) -> Dict[str, List[Dict]]:
-        """Group articles by source."""
-        by_source = {}
-        for article in self.collected_articles:
-            by_source.setdefault(article["source"], []).append(article)
-        return by_source
+        """Group articles by source (served from the maintained source index)."""
+        return self.source_index.by_source()
 
     async def report_to_summarizer(self) -> str:
         """Report collected articles to the summarizer agent."""
-        if not self.collected_articles:
+        if not self._collected_articles:
             return "No articles collected yet."
 
         days = self.config["hours_back"] // 24
-        report = f"I've collected {len(self.collected_articles)} tech articles from the last {days} days. Here's what I found:\n\n"
+        report = f"I've collected {len(self._collected_articles)} tech articles from the last {days} days. Here's what I found:\n\n"
 
         for source, source_articles in self._group_by_source().items():
             report += f"**{source}** ({len(source_articles)} articles):\n"
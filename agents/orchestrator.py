@@ -9,6 +9,7 @@ from typing import Dict, List
 from .collector import NewsCollectorAgent
 from .summarizer import NewsSummarizerAgent
 from .email_sender import EmailAgent
+from config import PRIORITY_COMPANIES
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,10 @@ class TechNewsOrchestrator:
     async def run_dialog_workflow(self):
         """Run the dialog workflow between collector, summarizer, and email agents."""
         # Collect news
-        articles = await self.collector.collect_news()
+        try:
+            articles = await self.collector.collect_news(mark_emitted=False)
+        finally:
+            await self.collector.close()
 
         # Collector reports
         report = await self.collector.report_to_summarizer()
@@ -42,8 +46,18 @@ class TechNewsOrchestrator:
         print("=" * 80)
         print(report)
 
-        # Summarizer analyzes
-        analysis = await self.summarizer.analyze_articles(articles)
+        # Summarizer analyzes; map-reduce mode summarizes the whole collected window
+        # (only articles not sent yet, in incremental mode) rather than just the
+        # max_articles selection
+        summary_input = articles
+        if self.config.get("map_reduce"):
+            summary_input = (
+                self.collector.articles_since(
+                    self.config["hours_back"], unemitted=bool(self.config.get("incremental"))
+                )
+                or articles
+            )
+        analysis = await self.summarizer.analyze_articles(summary_input)
         print("\n" + "=" * 80)
         print("🤖 SUMMARIZER ANALYSIS (Powered by Google Gemini):")
         print("=" * 80)
@@ -53,8 +67,15 @@ class TechNewsOrchestrator:
         await self._simulate_dialog(articles)
 
         # Send email to mailing list
+        delivered = True
         if self.mailing_list:
-            await self.email_agent.execute(analysis, articles, self.mailing_list)
+            sent = await self.email_agent.execute(analysis, articles, self.mailing_list)
+            # With email disabled the printed summary is the delivery
+            delivered = sent or not self.config.get("email_enabled")
+
+        # Only delivered articles count as seen for incremental runs
+        if delivered:
+            self.collector.mark_emitted([*articles, *summary_input])
 
         return analysis
 
@@ -67,10 +88,10 @@ class TechNewsOrchestrator:
         print("=" * 80)
 
         # Find top companies
-        by_source = self.collector._group_by_source()
-        priority = ["NVIDIA", "Intel", "AMD", "Qualcomm", "Broadcom", "OpenAI"]
+        counts = self.collector.source_index.counts()
+        priority = self.config.get("priority_companies", PRIORITY_COMPANIES)
         top = sorted(
-            [(co, len(by_source.get(co, []))) for co in priority if co in by_source],
+            [(co, counts[co]) for co in priority if co in counts],
             key=lambda x: x[1],
             reverse=True,
         )
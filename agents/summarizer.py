@@ -3,21 +3,152 @@ News Summarizer Agent
 Responsible for analyzing and summarizing collected news using Google Gemini.
 """
 
+import asyncio
 import logging
-import textwrap
 from typing import List, Dict
+from config import PRIORITY_COMPANIES
 from utils.ai_client import get_google_ai_client
+from utils.companies import company_tags
+from utils.dedup import collapse_near_duplicates
+from utils.response_cache import ResponseCache, request_key
 from utils.retry import retry_on_api_error
+from utils.tokens import estimate_tokens, pack
 
 logger = logging.getLogger(__name__)
 
 
+def compile_prompt(template: str) -> str:
+    """Normalize a prompt template: strip indentation and trailing space, collapse blank runs.
+
+    Args:
+        template: Raw template text as written in the source
+
+    Returns:
+        The template with every line stripped and at most one blank line in a row
+    """
+    lines = [line.strip() for line in template.strip().splitlines()]
+    compact = [line for i, line in enumerate(lines) if line or (i and lines[i - 1])]
+    return "\n".join(compact)
+
+
+# Summary prompt, compiled once at import; filled with {days} and {articles}
+PROMPT_TEMPLATE = compile_prompt(
+    """
+I am a software engineer at NVIDIA, interested in the world of technology and networking details, AI, etc.
+I would be happy to receive an email update once a week on the updates at the leading technology companies -
+everything you need to know to stay up to date with what is happening in the world of technology.
+Be as concise as possible, but also include the details that are important to me.
+I am interested in the following companies: NVIDIA, Intel, AMD, Qualcomm, Broadcom, and OpenAI.
+Create a comprehensive tech news summary from the last {days} days, with special focus on these priority companies: NVIDIA, Intel, AMD, Qualcomm, Broadcom, and OpenAI.
+
+Structure the response as follows:
+
+**🚀 NEW TECHNOLOGIES & PRODUCTS:**
+- Breakthrough technologies and innovative products
+- AI/ML developments and applications
+- Semiconductor advances and new architectures
+- Networking and infrastructure innovations
+- [Include specific product launches, technical specifications, and competitive advantages]
+
+**📈 BUSINESS & CORPORATE NEWS:**
+- CEO changes and executive movements
+- Major partnerships and acquisitions
+- Legal proceedings and intellectual property matters
+- Regulatory developments and policy changes
+- [Include specific names, dates, and business implications]
+
+**💰 CAPITAL MARKETS & STOCKS:**
+- Stock price movements and market analysis
+- Earnings reports and financial performance
+- Investment announcements and funding rounds
+- Market cap changes and valuation updates
+- [Include specific percentages, reasons for movements, and market context]
+
+**🎯 PRIORITY COMPANY UPDATES:**
+- **NVIDIA**: [GPU innovations, AI datacenter news, automotive, gaming, professional visualization]
+- **Intel**: [Processor launches, foundry business, AI chips, competition analysis]
+- **AMD**: [CPU/GPU competition, data center wins, market share changes]
+- **Qualcomm**: [Mobile chips, automotive partnerships, 5G developments]
+- **Broadcom**: [Networking infrastructure, AI hardware, acquisition activity]
+- **OpenAI**: [Model releases, partnerships, business model changes, competition]
+
+**🔍 MARKET ANALYSIS:**
+- **NVIDIA Product Portfolio & Market Position:**
+- Gaming GPUs: compared to AMD Radeon, Intel Arc
+- Data Center GPUs: compared to AMD MI series, Intel Gaudi
+- AI/ML Platforms: compared to Google TPU, AWS Trainium
+- Automotive: compared to Mobileye, Qualcomm Snapdragon
+- Professional Visualization: compared to AMD Radeon Pro
+- **Market Leadership Overview**: Industry positioning by segment
+- **Technology Roadmaps**: Upcoming product launches and market trends
+
+**🌍 INDUSTRY TRENDS & ANALYSIS:**
+- AI/ML Developments: [Model advances, training costs, inference optimization]
+- Semiconductor Industry: [Supply chain, manufacturing advances, geopolitical factors]
+- Data Center Evolution: [Cloud computing, edge computing, sustainability]
+- Automotive Technology: [Autonomous driving, electric vehicles, connectivity]
+
+**🌐 REGULATORY & POLICY:**
+- International Trade: [Export controls, investment policies]
+- Government AI Policies: [Regulation, safety standards]
+- Supply Chain: [Semiconductor manufacturing, materials sourcing]
+
+**📊 WEEKLY INTELLIGENCE BRIEF:**
+- Key metrics and performance indicators
+- Competitive positioning changes
+- Strategic partnership announcements
+- Technology adoption trends
+- Market sentiment and analyst opinions
+
+News articles:
+{articles}
+
+Structured Summary:
+"""
+)
+PROMPT_STATIC_TOKENS = estimate_tokens(PROMPT_TEMPLATE.format(days="", articles=""))
+
+# Map step of map-reduce summarization; filled with {companies} and {articles}
+CHUNK_PROMPT_TEMPLATE = compile_prompt(
+    """
+Extract the important tech news from the headlines below as concise bullet points.
+Keep company names, products, numbers and dates, and merge headlines about the same story.
+Give special attention to these priority companies: {companies}.
+
+News articles:
+{articles}
+
+Key points:
+"""
+)
+
+
+class ResponseBlockedError(Exception):
+    """Raised when Gemini returns no content; ``reason`` is the finish reason."""
+
+    def __init__(self, reason):
+        super().__init__(f"Gemini response blocked with reason: {reason}")
+        self.reason = reason
+
+
 class NewsSummarizerAgent:
     """Agent responsible for summarizing collected news using Google Gemini."""
 
     def __init__(self, config: Dict):
         self.config = config
         self.genai = None
+        self.prompt_stats: Dict[str, int] = {}
+        self.priority_companies = tuple(config.get("priority_companies", PRIORITY_COMPANIES))
+        cache_path = config.get("response_cache_path")
+        self.response_cache = (
+            ResponseCache(
+                cache_path,
+                ttl=config.get("response_cache_ttl", 7 * 24 * 3600),
+                max_bytes=config.get("response_cache_max_bytes", 5_000_000),
+            )
+            if cache_path
+            else None
+        )
 
     def _get_ai_client(self):
         """Get or initialize Google Gemini client (lazy loading)."""
@@ -25,88 +156,56 @@ class NewsSummarizerAgent:
             self.genai = get_google_ai_client()
         return self.genai
 
+    def _priority_rank(self, article: Dict) -> int:
+        """Return 0 for articles about a priority company, 1 otherwise."""
+        return 0 if company_tags(article, self.priority_companies) else 1
+
+    def _article_line(self, article: Dict) -> str:
+        return f"- {article['source']}: {article['title']}"
+
     def _build_prompt(self, articles: List[Dict], days: int) -> str:
-        """Build the AI prompt for summarization."""
-        articles_text = "\n".join(
-            [f"- {a['source']}: {a['title']}" for a in articles[: self.config["max_ai"]]]
+        """Build the AI prompt for summarization and record its token counts.
+
+        Articles about priority companies are ranked first (otherwise keeping their
+        order), then packed into the prompt until ``ai_token_budget`` is used up, leaving
+        ``ai_tokens`` of it for the response. ``max_ai`` still caps the article count.
+        ``prompt_stats`` is updated with the estimated tokens of the static template, the
+        article lines and the whole prompt, for tracking prompt cost over time.
+        """
+        budget = self.config.get("ai_token_budget")
+        available = (
+            budget - self.config["ai_tokens"] - PROMPT_STATIC_TOKENS if budget else float("inf")
         )
-
-        return textwrap.dedent(
-            f"""I am a software engineer at NVIDIA, interested in the world of technology and networking details, AI, etc.
-                                    I would be happy to receive an email update once a week on the updates at the leading technology companies -
-                                    everything you need to know to stay up to date with what is happening in the world of technology.
-                                    Be as concise as possible, but also include the details that are important to me.
-                                    I am interested in the following companies: NVIDIA, Intel, AMD, Qualcomm, Broadcom, and OpenAI.
-                                    Create a comprehensive tech news summary from the last {days} days, with special focus on these priority companies: NVIDIA, Intel, AMD, Qualcomm, Broadcom, and OpenAI.
-
-                                    Structure the response as follows:
-
-                                    **🚀 NEW TECHNOLOGIES & PRODUCTS:**
-                                    - Breakthrough technologies and innovative products
-                                    - AI/ML developments and applications
-                                    - Semiconductor advances and new architectures
-                                    - Networking and infrastructure innovations
-                                    - [Include specific product launches, technical specifications, and competitive advantages]
-
-                                    **📈 BUSINESS & CORPORATE NEWS:**
-                                    - CEO changes and executive movements
-                                    - Major partnerships and acquisitions
-                                    - Legal proceedings and intellectual property matters
-                                    - Regulatory developments and policy changes
-                                    - [Include specific names, dates, and business implications]
-
-                                    **💰 CAPITAL MARKETS & STOCKS:**
-                                    - Stock price movements and market analysis
-                                    - Earnings reports and financial performance
-                                    - Investment announcements and funding rounds
-                                    - Market cap changes and valuation updates
-                                    - [Include specific percentages, reasons for movements, and market context]
-
-                                    **🎯 PRIORITY COMPANY UPDATES:**
-                                    - **NVIDIA**: [GPU innovations, AI datacenter news, automotive, gaming, professional visualization]
-                                    - **Intel**: [Processor launches, foundry business, AI chips, competition analysis]
-                                    - **AMD**: [CPU/GPU competition, data center wins, market share changes]
-                                    - **Qualcomm**: [Mobile chips, automotive partnerships, 5G developments]
-                                    - **Broadcom**: [Networking infrastructure, AI hardware, acquisition activity]
-                                    - **OpenAI**: [Model releases, partnerships, business model changes, competition]
-
-                                    **🔍 MARKET ANALYSIS:**
-                                    - **NVIDIA Product Portfolio & Market Position:**
-                                    - Gaming GPUs: compared to AMD Radeon, Intel Arc
-                                    - Data Center GPUs: compared to AMD MI series, Intel Gaudi
-                                    - AI/ML Platforms: compared to Google TPU, AWS Trainium
-                                    - Automotive: compared to Mobileye, Qualcomm Snapdragon
-                                    - Professional Visualization: compared to AMD Radeon Pro
-                                    - **Market Leadership Overview**: Industry positioning by segment
-                                    - **Technology Roadmaps**: Upcoming product launches and market trends
-
-                                    **🌍 INDUSTRY TRENDS & ANALYSIS:**
-                                    - AI/ML Developments: [Model advances, training costs, inference optimization]
-                                    - Semiconductor Industry: [Supply chain, manufacturing advances, geopolitical factors]
-                                    - Data Center Evolution: [Cloud computing, edge computing, sustainability]
-                                    - Automotive Technology: [Autonomous driving, electric vehicles, connectivity]
-
-                                    **🌐 REGULATORY & POLICY:**
-                                    - International Trade: [Export controls, investment policies]
-                                    - Government AI Policies: [Regulation, safety standards]
-                                    - Supply Chain: [Semiconductor manufacturing, materials sourcing]
-
-                                    **📊 WEEKLY INTELLIGENCE BRIEF:**
-                                    - Key metrics and performance indicators
-                                    - Competitive positioning changes
-                                    - Strategic partnership announcements
-                                    - Technology adoption trends
-                                    - Market sentiment and analyst opinions
-
-                                    News articles:
-                                    {articles_text}
-
-                                    Structured Summary:"""
+        ranked = sorted(articles, key=self._priority_rank)
+        lines = pack(
+            [self._article_line(a) for a in ranked],
+            available,
+            lambda line: estimate_tokens(line + "\n"),
+            limit=self.config["max_ai"],
         )
+        if len(lines) < min(len(articles), self.config["max_ai"]):
+            logger.info(f"Token budget fits {len(lines)} of {len(articles)} articles")
+        articles_text = "\n".join(lines)
+
+        prompt = PROMPT_TEMPLATE.format(days=days, articles=articles_text)
+        self.prompt_stats = {
+            "articles": len(lines),
+            "static_tokens": PROMPT_STATIC_TOKENS,
+            "article_tokens": estimate_tokens(articles_text),
+            "total_tokens": estimate_tokens(prompt),
+        }
+        logger.info(f"Prompt token estimate: {self.prompt_stats}")
+        return prompt
 
     @retry_on_api_error()
     async def _call_gemini_with_retry(self, model, prompt: str, genai) -> str:
-        """Call Gemini API with retry logic for transient failures."""
+        """Call Gemini API with retry logic for transient failures.
+
+        The SDK call is blocking, so it runs in a worker thread and the event loop keeps
+        serving other work (fetching, rendering, sending) while Gemini generates. With
+        ``ai_timeout`` set, the request carries that timeout and the await is abandoned
+        once it expires, raising TimeoutError (retried like other transient failures).
+        """
         logger.debug(f"Calling Gemini API with model: {self.config['model']}")
 
         safety_settings = [
@@ -119,17 +218,147 @@ class NewsSummarizerAgent:
             ]
         ]
 
-        response = model.generate_content(
+        timeout = self.config.get("ai_timeout")
+        kwargs = {"request_options": {"timeout": timeout}} if timeout else {}
+        call = asyncio.to_thread(
+            model.generate_content,
             prompt,
             generation_config=genai.types.GenerationConfig(
                 max_output_tokens=self.config["ai_tokens"], temperature=self.config["ai_temp"]
             ),
             safety_settings=safety_settings,
+            **kwargs,
         )
+        try:
+            response = await asyncio.wait_for(call, timeout) if timeout else await call
+        except asyncio.TimeoutError as e:
+            # Before Python 3.11 asyncio.TimeoutError is not the builtin the retry policy expects
+            raise TimeoutError(f"Gemini call timed out after {timeout}s") from e
 
         logger.info("Gemini API call successful")
         return response
 
+    async def _generate(self, model, prompt: str, genai) -> str:
+        """Generate text for a prompt, answering from the response cache when possible.
+
+        Only successful responses are cached, so a blocked response is retried on the
+        next run.
+
+        Raises:
+            ResponseBlockedError: If Gemini returned no content
+        """
+        key = request_key(
+            self.config["model"], prompt, self.config["ai_temp"], self.config["ai_tokens"]
+        )
+        if self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                logger.info("Using cached Gemini response")
+                return cached
+
+        response = await self._call_gemini_with_retry(model, prompt, genai)
+
+        # Check if response was blocked
+        if not response.candidates or not response.candidates[0].content.parts:
+            reason = response.candidates[0].finish_reason if response.candidates else "Unknown"
+            logger.warning(f"Gemini response blocked with reason: {reason}")
+            raise ResponseBlockedError(reason)
+
+        summary = response.text.strip()
+        if self.response_cache is not None:
+            self.response_cache.put(key, summary)
+        return summary
+
+    def _blocked_message(self, reason) -> str:
+        """Explain a blocked response to the user."""
+        # Map finish reasons to user-friendly messages
+        reason_messages = {
+            1: "STOP - Normal completion (but empty response)",
+            2: "SAFETY - Content filtered by safety settings. Try softening the prompt language.",
+            3: "RECITATION - Content blocked due to recitation. Try rephrasing the prompt.",
+            4: "OTHER - Unknown blocking reason",
+            5: "MAX_TOKENS - Response too long. Increase ai_tokens in config.py",
+        }
+
+        reason_text = reason_messages.get(reason, f"Unknown reason code: {reason}")
+        return (
+            f"⚠️ AI response was blocked.\n"
+            f"Reason: {reason_text}\n\n"
+            f"Possible causes:\n"
+            f"- API quota exceeded (check: https://aistudio.google.com/app/apikey)\n"
+            f"- Content safety filters triggered\n"
+            f"- Rate limit reached (wait a few minutes)\n\n"
+            f"Try: Reduce max_ai in config.py or wait and retry."
+        )
+
+    async def _map_reduce(self, model, articles: List[Dict], days: int, genai) -> str:
+        """Summarize a large article set in chunks, then merge the chunk notes.
+
+        Articles are ranked by priority and split into ``chunk_size`` chunks. The chunks
+        are summarized concurrently, at most ``map_concurrency`` at a time, and a final call
+        turns the notes into the sectioned newsletter. Chunks whose response was blocked are
+        left out of the merge, and so are the lowest priority notes that do not fit
+        ``ai_token_budget``. If a chunk call fails, the chunks not yet started are cancelled.
+
+        Raises:
+            ResponseBlockedError: If every chunk response was blocked
+        """
+        chunk_size = max(1, self.config.get("chunk_size", 40))
+        ranked = sorted(articles, key=self._priority_rank)
+        chunks = [ranked[i : i + chunk_size] for i in range(0, len(ranked), chunk_size)]
+        semaphore = asyncio.Semaphore(max(1, self.config.get("map_concurrency", 4)))
+        companies = ", ".join(self.priority_companies)
+
+        failed = asyncio.Event()
+
+        async def summarize_chunk(chunk):
+            prompt = CHUNK_PROMPT_TEMPLATE.format(
+                companies=companies, articles="\n".join(map(self._article_line, chunk))
+            )
+            async with semaphore:
+                # Set before the semaphore is released, so no queued chunk starts a call
+                if failed.is_set():
+                    return None
+                try:
+                    return await self._generate(model, prompt, genai)
+                except ResponseBlockedError as e:
+                    return e
+                except Exception:
+                    failed.set()
+                    raise
+
+        tasks = [asyncio.ensure_future(summarize_chunk(chunk)) for chunk in chunks]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        notes = [note for note in results if isinstance(note, str)]
+        if not notes:
+            raise results[0]
+
+        # Notes are in priority order, so the lowest priority chunks are dropped to fit
+        budget = self.config.get("ai_token_budget")
+        available = (
+            budget - self.config["ai_tokens"] - PROMPT_STATIC_TOKENS if budget else float("inf")
+        )
+        fitted = pack(notes, available, lambda note: estimate_tokens(note + "\n\n"))
+        if len(fitted) < len(notes):
+            logger.warning(f"Token budget fits notes from {len(fitted)} of {len(notes)} chunks")
+        logger.info(f"Merging notes from {len(fitted)} of {len(chunks)} article chunks")
+
+        notes_text = "\n\n".join(fitted)
+        prompt = PROMPT_TEMPLATE.format(days=days, articles=notes_text)
+        self.prompt_stats = {
+            "articles": len(articles),
+            "chunks": len(chunks),
+            "static_tokens": PROMPT_STATIC_TOKENS,
+            "article_tokens": estimate_tokens(notes_text),
+            "total_tokens": estimate_tokens(prompt),
+        }
+        return await self._generate(model, prompt, genai)
+
     async def analyze_articles(self, articles: List[Dict]) -> str:
         """Analyze and summarize collected articles using Google Gemini."""
         if not articles:
@@ -145,40 +374,23 @@ class NewsSummarizerAgent:
 
             print("🤖 Generating AI summary with Google Gemini (this may take 30-60 seconds)...")
 
-            prompt = self._build_prompt(articles, days)
-            response = await self._call_gemini_with_retry(model, prompt, genai)
+            unique = collapse_near_duplicates(articles, self.config.get("near_dup_threshold", 0.6))
+            if len(unique) < len(articles):
+                logger.info(f"Collapsed {len(articles) - len(unique)} near-duplicate articles")
 
-            print("✅ AI summary generated successfully!\n")
-
-            # Check if response was blocked
-            if not response.candidates or not response.candidates[0].content.parts:
-                reason = response.candidates[0].finish_reason if response.candidates else "Unknown"
-                logger.warning(f"Gemini response blocked with reason: {reason}")
-
-                # Map finish reasons to user-friendly messages
-                reason_messages = {
-                    1: "STOP - Normal completion (but empty response)",
-                    2: "SAFETY - Content filtered by safety settings. Try softening the prompt language.",
-                    3: "RECITATION - Content blocked due to recitation. Try rephrasing the prompt.",
-                    4: "OTHER - Unknown blocking reason",
-                    5: "MAX_TOKENS - Response too long. Increase ai_tokens in config.py",
-                }
-
-                reason_text = reason_messages.get(reason, f"Unknown reason code: {reason}")
-                return (
-                    f"⚠️ AI response was blocked.\n"
-                    f"Reason: {reason_text}\n\n"
-                    f"Possible causes:\n"
-                    f"- API quota exceeded (check: https://aistudio.google.com/app/apikey)\n"
-                    f"- Content safety filters triggered\n"
-                    f"- Rate limit reached (wait a few minutes)\n\n"
-                    f"Try: Reduce max_ai in config.py or wait and retry."
-                )
+            if self.config.get("map_reduce") and len(unique) > self.config.get("chunk_size", 40):
+                summary = await self._map_reduce(model, unique, days, genai)
+            else:
+                prompt = self._build_prompt(unique, days)
+                summary = await self._generate(model, prompt, genai)
 
-            summary = response.text.strip()
+            print("✅ AI summary generated successfully!\n")
             logger.info(f"Analysis completed, summary length: {len(summary)} characters")
             return summary
 
+        except ResponseBlockedError as e:
+            return self._blocked_message(e.reason)
+
         except Exception as e:
             error_msg = str(e).lower()
             logger.error(f"Analysis failed: {e}", exc_info=True)
@@ -23,17 +23,66 @@ RSS_FEEDS = {
     "CNET": "https://www.cnet.com/rss/news/",
 }
 
+# Priority companies get extra attention in the dialog and the summary
+PRIORITY_COMPANIES = ["NVIDIA", "Intel", "AMD", "Qualcomm", "Broadcom", "OpenAI"]
+
+# Feed priority classes ("high", "normal", "low"); unlisted feeds are "normal".
+# Higher classes are fetched first and may use more of the collection deadline.
+FEED_PRIORITIES = {source: "high" for source in PRIORITY_COMPANIES}
+
 # Main Configuration
 CONFIG = {
     # Article Collection
     "max_articles": 10,
+    "max_per_source": 0,  # Per-source quota for max_articles (0 = no quota)
     "max_ai": 15,
+    "near_dup_threshold": 0.6,  # Headline similarity (Jaccard) that collapses stories, 0 = off
     "hours_back": int(os.getenv("HOURS_BACK", "120")),
+    # Feed Fetching
+    "fetch_concurrency": int(os.getenv("FETCH_CONCURRENCY", "8")),
+    "feed_timeout": float(os.getenv("FEED_TIMEOUT", "30")),
+    "collection_deadline": float(os.getenv("COLLECTION_DEADLINE", "90")),
+    "feed_priorities": FEED_PRIORITIES,
+    "priority_companies": PRIORITY_COMPANIES,
+    # Fraction of the collection deadline each priority class may use
+    "deadline_shares": {"high": 1.0, "normal": 0.75, "low": 0.5},
+    "pooled_http": os.getenv("POOLED_HTTP", "true").lower() == "true",
+    "per_host_connections": 4,  # Max in-flight requests per host
+    "host_rate": 2.0,  # Requests per second per host (0 = unlimited)
+    "host_burst": 2,
+    "parse_workers": int(os.getenv("PARSE_WORKERS", "0")),  # Feed parsing processes (0 = off)
+    "summary_max_chars": 500,  # Summaries are stripped of HTML and cut to this length
+    "stale_run_limit": 3,  # Stop parsing a date-ordered feed after this many old entries
+    "feed_cache_path": os.getenv("FEED_CACHE_PATH", ".cache/feed_cache.json"),
+    # Feed Health (skip a feed for breaker_cooldown seconds after breaker_threshold failures)
+    "feed_health_path": os.getenv("FEED_HEALTH_PATH", ".cache/feed_health.json"),
+    "breaker_threshold": 3,
+    "breaker_cooldown": 6 * 3600,
+    # Adaptive Polling (skip feeds unlikely to have new content, serving them from the cache)
+    "adaptive_polling": os.getenv("ADAPTIVE_POLLING", "false").lower() == "true",
+    "scheduler_path": os.getenv("SCHEDULER_PATH", ".cache/feed_schedule.json"),
+    "min_poll_interval": 900,  # seconds
+    "max_poll_interval": 86400,  # seconds
+    # Article History (incremental = only return articles not collected in earlier runs)
+    "article_store_path": os.getenv("ARTICLE_STORE_PATH", ".cache/articles.db"),
+    "incremental": os.getenv("INCREMENTAL", "false").lower() == "true",
+    "history_hours": 720,  # Stored history loaded at startup for articles_since() queries
     # Google AI Configuration
     "google_api_key": os.getenv("GOOGLE_API_KEY", ""),
     "model": "models/gemini-2.5-flash",
     "ai_tokens": 2000,
+    # Tokens per Gemini call (prompt + ai_tokens response); articles are packed to fit
+    "ai_token_budget": 32000,
     "ai_temp": 0.7,
+    # Map-reduce summarization (chunks summarized concurrently, then merged in one call)
+    "map_reduce": os.getenv("MAP_REDUCE", "false").lower() == "true",
+    "chunk_size": 40,  # Articles per chunk; smaller sets use a single call
+    "map_concurrency": 4,  # Max chunk calls in flight
+    # Gemini response cache (same model + prompt + settings reuses the stored summary)
+    "response_cache_path": os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.db"),
+    "response_cache_ttl": 7 * 24 * 3600,  # seconds
+    "response_cache_max_bytes": 5_000_000,
+    "ai_timeout": float(os.getenv("AI_TIMEOUT", "120")),  # seconds per Gemini call, 0 = none
     # Email Configuration
     "email_enabled": os.getenv("EMAIL_ENABLED", "false").lower() == "true",
     "email_user": os.getenv("EMAIL_USER", ""),
@@ -144,6 +144,44 @@ def mock_rss_feed():
     return feed
 
 
+@pytest.fixture
+def make_rss_entry():
+    """Factory for mock RSS entries published a number of hours ago.
+
+    Call as ``make_rss_entry(link, hours_ago=1, title=None, summary="")``; the title
+    defaults to "Article from <link>".
+    """
+
+    def make(link, hours_ago=1, title=None, summary=""):
+        entry = Mock()
+        entry.title = f"Article from {link}" if title is None else title
+        entry.link = link
+        entry.summary = summary
+        entry.published_parsed = (
+            datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+        ).timetuple()[:9]
+        return entry
+
+    return make
+
+
+@pytest.fixture
+def make_rss_feed(make_rss_entry):
+    """Factory for mock RSS feeds.
+
+    ``make_rss_feed(url)`` returns a feed with one entry linking to ``url`` published an
+    hour ago; ``make_rss_feed(entries=[...])`` wraps entries built with make_rss_entry.
+    """
+
+    def make(url=None, hours_ago=1, entries=None):
+        feed = Mock()
+        feed.entries = [make_rss_entry(url, hours_ago)] if entries is None else list(entries)
+        feed.bozo = False
+        return feed
+
+    return make
+
+
 # =============================================================================
 # MOCK GEMINI API FIXTURES
 # =============================================================================
@@ -3,9 +3,17 @@ Component tests for NewsCollectorAgent
 Tests with mocked external dependencies (RSS feeds).
 """
 
+import time
+import feedparser
+import httpx
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import Mock, patch
+from utils.article_store import ArticleStore
+from utils.feed_cache import FeedCache
+from utils.feed_health import FeedHealth
+from utils.feed_scheduler import FeedScheduler
+from utils.rate_limit import HostRateLimiter
 
 
 @pytest.mark.unit
@@ -92,7 +100,7 @@ class TestCollectorWithMockedFeeds:
             # Good entry
             good_entry = Mock()
             good_entry.title = "Good Article"
-            good_entry.link = "https://example.com/good"
+            good_entry.link = f"{url}/good"
             good_entry.summary = "Good"
             good_entry.published_parsed = (
                 datetime.now(timezone.utc) - timedelta(hours=1)
@@ -121,15 +129,18 @@ class TestCollectorWithMockedFeeds:
     @pytest.mark.asyncio
     async def test_collect_news_handles_missing_dates(self, collector):
         """Test handling of entries without published date."""
-        mock_feed = Mock()
-        entry = Mock()
-        entry.title = "Article Without Date"
-        entry.link = "https://example.com/no-date"
-        entry.summary = "No date"
-        entry.published_parsed = None
-        mock_feed.entries = [entry]
 
-        with patch("feedparser.parse", return_value=mock_feed):
+        def mock_parse(url):
+            mock_feed = Mock()
+            entry = Mock()
+            entry.title = "Article Without Date"
+            entry.link = f"{url}/no-date"
+            entry.summary = "No date"
+            entry.published_parsed = None
+            mock_feed.entries = [entry]
+            return mock_feed
+
+        with patch("feedparser.parse", side_effect=mock_parse):
             articles = await collector.collect_news()
 
         assert len(articles) >= 3
@@ -145,3 +156,352 @@ class TestCollectorWithMockedFeeds:
             articles = await collector.collect_news()
 
         assert articles == []
+
+    @pytest.mark.asyncio
+    async def test_collect_news_fetches_feeds_concurrently(self, collector):
+        """Test that feeds are fetched in parallel rather than one after another."""
+        collector.config["fetch_concurrency"] = 3
+
+        def slow_parse(url):
+            time.sleep(0.3)
+            mock_feed = Mock()
+            mock_feed.entries = []
+            return mock_feed
+
+        start = time.monotonic()
+        with patch("feedparser.parse", side_effect=slow_parse):
+            await collector.collect_news()
+
+        # Three feeds at 0.3s each would take ~0.9s sequentially
+        assert time.monotonic() - start < 0.8
+
+    @pytest.mark.asyncio
+    async def test_collect_news_skips_feeds_past_timeout(self, collector, make_rss_feed):
+        """Test that a feed exceeding feed_timeout is dropped without failing the run."""
+        collector.config["feed_timeout"] = 0.2
+
+        def mock_parse(url):
+            if "techcrunch.com" in url:
+                time.sleep(0.5)
+            return make_rss_feed(url)
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            articles = await collector.collect_news()
+
+        assert len(articles) == 2
+        assert all(article["source"] != "TechCrunch" for article in articles)
+        assert collector.cut_off_feeds == ["TechCrunch"]
+
+    @pytest.mark.asyncio
+    async def test_collect_news_returns_partial_results_at_deadline(self, collector, make_rss_feed):
+        """Test that the collection deadline returns what arrived and records the rest."""
+        collector.config["collection_deadline"] = 0.3
+        collector.config["fetch_concurrency"] = 1
+
+        def mock_parse(url):
+            time.sleep(0.2)
+            return make_rss_feed(url)
+
+        start = time.monotonic()
+        with patch("feedparser.parse", side_effect=mock_parse):
+            articles = await collector.collect_news()
+
+        assert time.monotonic() - start < 0.5
+        assert len(articles) == 1
+        assert len(collector.cut_off_feeds) == 2
+
+    @pytest.mark.asyncio
+    async def test_collect_news_throttled_host_does_not_hold_fetch_slots(self, collector):
+        """Test that a feed waiting for its host's token leaves the fetch slot to other hosts."""
+        collector.config["fetch_concurrency"] = 1
+        collector.rss_feeds = {
+            "Slow A": "https://slow.example.com/a",
+            "Slow B": "https://slow.example.com/b",
+            "Other": "https://other.example.com/feed",
+        }
+        collector.rate_limiter = HostRateLimiter(rate=2)
+        fetched = {}
+        start = time.monotonic()
+
+        def mock_parse(url):
+            fetched[url] = time.monotonic() - start
+            return feedparser.FeedParserDict(entries=[])
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            await collector.collect_news()
+
+        # The second slow.example.com feed waits ~0.5s for a token without blocking the other host
+        assert fetched["https://other.example.com/feed"] < 0.3
+        assert fetched["https://slow.example.com/b"] >= 0.4
+
+    @pytest.mark.asyncio
+    async def test_collect_news_dispatches_priority_feeds_first(self, collector, tmp_path):
+        """Test that high priority feeds go first and low priority feeds get a smaller budget."""
+        collector.config["fetch_concurrency"] = 1
+        collector.config["collection_deadline"] = 0.6
+        collector.config["feed_priorities"] = {"NVIDIA": "high", "TechCrunch": "low"}
+        collector.config["deadline_shares"] = {"high": 1.0, "normal": 1.0, "low": 0.5}
+        collector.feed_health = FeedHealth(str(tmp_path / "health.json"), failure_threshold=1)
+        fetched = []
+
+        def mock_parse(url):
+            fetched.append(url)
+            time.sleep(0.2)
+            return feedparser.FeedParserDict(entries=[])
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            await collector.collect_news()
+
+        # TechCrunch's 0.3s share is used up by the time the other two feeds finish
+        assert fetched == ["https://nvidianews.nvidia.com/rss", "https://theverge.com/rss"]
+        assert collector.cut_off_feeds == ["TechCrunch"]
+        # Never contacted, so its circuit stays closed
+        assert collector.feed_health.allow("https://techcrunch.com/feed/")
+
+    @pytest.mark.asyncio
+    async def test_collect_news_reuses_cached_entries_on_304(self, collector, tmp_path):
+        """Test conditional GET: validators are sent and a 304 reuses cached entries."""
+        collector.feed_cache = FeedCache(str(tmp_path / "feeds.json"))
+        published = (datetime.now(timezone.utc) - timedelta(hours=1)).timetuple()
+        calls = []
+
+        def mock_parse(url, **validators):
+            calls.append(validators)
+            if validators:
+                return feedparser.FeedParserDict(entries=[], status=304)
+            entry = feedparser.FeedParserDict(
+                title=f"Article from {url}", link=url, summary="", published_parsed=published
+            )
+            return feedparser.FeedParserDict(entries=[entry], status=200, etag='"v1"')
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            first = await collector.collect_news()
+            second = await collector.collect_news()
+
+        assert len(first) == len(second) == 3
+        assert sorted(a["link"] for a in first) == sorted(a["link"] for a in second)
+        assert calls[3:] == [{"etag": '"v1"'}] * 3
+
+    @pytest.mark.asyncio
+    async def test_collect_news_drops_cross_feed_duplicates(
+        self, collector, make_rss_feed, make_rss_entry
+    ):
+        """Test that the same story in several feeds (with tracking params) is kept once."""
+
+        def mock_parse(url):
+            link = f"https://Example.com/openai-model/?utm_source={url}"
+            return make_rss_feed(entries=[make_rss_entry(link, title="OpenAI Launches New Model")])
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            articles = await collector.collect_news()
+
+        assert len(articles) == 1
+        assert collector.dedup_index.duplicates == 2
+
+    @pytest.mark.asyncio
+    async def test_collect_news_keeps_malformed_links(self, collector, tmp_path, make_rss_feed):
+        """Test that an unparseable link does not abort collection."""
+        collector.article_store = ArticleStore(str(tmp_path / "articles.db"))
+
+        def mock_parse(url):
+            return make_rss_feed("http://example.com:80a/x" if "nvidia" in url else url)
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            articles = await collector.collect_news()
+
+        assert len(articles) == 3
+        assert "http://example.com:80a/x" in [a["link"] for a in articles]
+
+    @pytest.mark.asyncio
+    async def test_collect_news_incremental_returns_only_new_articles(
+        self, collector, tmp_path, make_rss_feed, make_rss_entry
+    ):
+        """Test that incremental mode skips articles recorded in an earlier run."""
+        collector.article_store = ArticleStore(str(tmp_path / "articles.db"))
+        collector.config["incremental"] = True
+        links = ["https://example.com/first"]
+
+        def mock_parse(url):
+            return make_rss_feed(entries=[make_rss_entry(link) for link in links])
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            first = await collector.collect_news()
+            links.append("https://example.com/second?utm_source=rss")
+            second = await collector.collect_news()
+
+        assert [a["link"] for a in first] == ["https://example.com/first"]
+        assert [a["link"] for a in second] == ["https://example.com/second?utm_source=rss"]
+        assert len(collector.article_store) == 2
+
+    @pytest.mark.asyncio
+    async def test_collect_news_incremental_keeps_unselected_articles(
+        self, collector, tmp_path, make_rss_feed
+    ):
+        """Test that articles cut by max_articles or never marked emitted come back later."""
+        collector.article_store = ArticleStore(str(tmp_path / "articles.db"))
+        collector.config["incremental"] = True
+        collector.config["max_articles"] = 1
+        hours = {url: i + 1 for i, url in enumerate(collector.rss_feeds.values())}
+
+        def mock_parse(url):
+            return make_rss_feed(url, hours_ago=hours[url])
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            undelivered = await collector.collect_news(mark_emitted=False)
+            first = await collector.collect_news()
+            second = await collector.collect_news()
+
+        assert first == undelivered
+        assert len(second) == 1 and second != first
+
+    @pytest.mark.asyncio
+    async def test_collect_news_iter_streams_articles(self, collector, make_rss_feed):
+        """Test that the streaming API yields articles per feed and tracks the running top-K."""
+        collector.config["max_articles"] = 2
+
+        seen = []
+        with patch("feedparser.parse", side_effect=make_rss_feed):
+            async for article in collector.collect_news_iter():
+                seen.append(article)
+                assert len(collector.current_top()) == min(len(seen), 2)
+
+        assert len(seen) == 3
+        # Streaming does not replace the last completed collection
+        assert collector.collected_articles == []
+
+    @pytest.mark.asyncio
+    async def test_collect_news_skips_feeds_with_open_circuit(self, collector, tmp_path):
+        """Test that a failing feed is skipped on the next run once its breaker opens."""
+        collector.feed_health = FeedHealth(str(tmp_path / "health.json"), failure_threshold=1)
+        fetched = []
+
+        def mock_parse(url):
+            fetched.append(url)
+            if "techcrunch.com" in url:
+                raise Exception("Network error")
+            mock_feed = Mock()
+            mock_feed.entries = []
+            mock_feed.get = {"status": 200}.get
+            return mock_feed
+
+        with patch("feedparser.parse", side_effect=mock_parse):
+            await collector.collect_news()
+            fetched.clear()
+            await collector.collect_news()
+
+        assert collector.skipped_feeds == ["TechCrunch"]
+        assert len(fetched) == 2
+        assert all("techcrunch.com" not in url for url in fetched)
+
+    @pytest.mark.asyncio
+    async def test_articles_since_answers_from_history(
+        self, collector, make_rss_feed, make_rss_entry
+    ):
+        """Test that shorter windows are answered from the collected history without refetching."""
+        collector.config["max_articles"] = 1
+
+        def mock_parse(url):
+            entries = [make_rss_entry(f"{url}/{hours}", hours_ago=hours) for hours in (1, 30)]
+            return make_rss_feed(entries=entries)
+
+        with patch("feedparser.parse", side_effect=mock_parse) as mock_parse_call:
+            await collector.collect_news()
+        assert mock_parse_call.call_count == 3
+
+        assert len(collector.articles_since(24)) == 3
+        assert len(collector.articles_since(48)) == 6
+        assert [a.source for a in collector.articles_since(48, sources=["NVIDIA"])] == [
+            "NVIDIA",
+            "NVIDIA",
+        ]
+
+
+RSS_TEMPLATE = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>{host}</title>
+<item><title>Story from {host}</title><link>https://{host}/story</link>
+<pubDate>{pub_date}</pubDate><description>Summary</description></item>
+</channel></rss>"""
+
+
+@pytest.mark.unit
+class TestCollectorWithPooledClient:
+    """Test NewsCollectorAgent fetching through the pooled HTTP client."""
+
+    @pytest.fixture
+    def pooled_collector(self, collector, tmp_path):
+        collector.config["pooled_http"] = True
+        collector.feed_cache = FeedCache(str(tmp_path / "feeds.json"))
+        return collector
+
+    def _transport(self, requests):
+        pub_date = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime(
+            "%a, %d %b %Y %H:%M:%S +0000"
+        )
+
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            body = RSS_TEMPLATE.format(host=request.url.host, pub_date=pub_date)
+            return httpx.Response(200, content=body.encode(), headers={"ETag": '"v1"'})
+
+        return httpx.MockTransport(handler)
+
+    @pytest.mark.asyncio
+    async def test_collect_news_parses_downloaded_bytes(self, pooled_collector):
+        """Test that feeds are downloaded once per URL and parsed from raw bytes."""
+        requests = []
+        pooled_collector.http_client = httpx.AsyncClient(transport=self._transport(requests))
+
+        with patch("feedparser.parse", wraps=feedparser.parse) as mock_parse:
+            articles = await pooled_collector.collect_news()
+
+        assert len(requests) == 3
+        assert sorted(a["title"] for a in articles) == [
+            "Story from nvidianews.nvidia.com",
+            "Story from techcrunch.com",
+            "Story from theverge.com",
+        ]
+        assert all(isinstance(call.args[0], bytes) for call in mock_parse.call_args_list)
+        await pooled_collector.close()
+        assert pooled_collector.http_client is None
+
+    @pytest.mark.asyncio
+    async def test_collect_news_sends_validators_and_reuses_cache(self, pooled_collector):
+        """Test conditional GET through the pooled client: a 304 reuses cached entries."""
+        requests = []
+        pooled_collector.http_client = httpx.AsyncClient(transport=self._transport(requests))
+
+        first = await pooled_collector.collect_news()
+        second = await pooled_collector.collect_news()
+
+        assert len(first) == len(second) == 3
+        assert [r.headers.get("if-none-match") for r in requests[3:]] == ['"v1"'] * 3
+        await pooled_collector.close()
+
+    @pytest.mark.asyncio
+    async def test_collect_news_parses_in_process_pool(self, pooled_collector):
+        """Test that parse_workers sends raw bytes to worker processes."""
+        pooled_collector.config["parse_workers"] = 2
+        pooled_collector.http_client = httpx.AsyncClient(transport=self._transport([]))
+
+        articles = await pooled_collector.collect_news()
+
+        assert len(articles) == 3
+        assert pooled_collector._parse_pool is not None
+        await pooled_collector.close()
+        assert pooled_collector._parse_pool is None
+
+    @pytest.mark.asyncio
+    async def test_collect_news_skips_feeds_not_due(self, pooled_collector, tmp_path):
+        """Test that adaptive polling serves feeds that are not due from the cache."""
+        requests = []
+        pooled_collector.feed_scheduler = FeedScheduler(str(tmp_path / "schedule.json"))
+        pooled_collector.http_client = httpx.AsyncClient(transport=self._transport(requests))
+
+        first = await pooled_collector.collect_news()
+        second = await pooled_collector.collect_news()
+
+        assert len(requests) == 3
+        assert sorted(a["link"] for a in first) == sorted(a["link"] for a in second)
+        await pooled_collector.close()
@@ -2,8 +2,21 @@
 Tests pure functions with no external dependencies.
 """
 
+import feedparser
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from unittest.mock import Mock
+from agents.collector import parse_feed_compact
+from utils.feed_cache import FeedCache, expand_feed
+
+ATOM_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example</title>
+  <updated>{old}</updated>
+  <entry><title>Recent</title><link href="https://example.com/recent"/><updated>{recent}</updated></entry>
+  <entry><title>Old</title><link href="https://example.com/old"/><updated>{old}</updated></entry>
+  <entry><title>Undated</title><link href="https://example.com/undated"/></entry>
+</feed>"""
 
 
 class TestCollectorPureFunctions:
@@ -28,6 +41,18 @@ class TestCollectorPureFunctions:
         assert len(result["TechCrunch"]) == 2
         assert len(result["The Verge"]) == 1
 
+    def test_source_index_follows_collected_articles(self, collector, sample_articles):
+        """Test that replacing collected_articles rebuilds the source index."""
+        collector.collected_articles = sample_articles
+        assert collector.source_index.count("TechCrunch") == 2
+
+        collector.collected_articles = sample_articles[1:2]
+        assert collector.source_index.counts() == {"The Verge": 1}
+
+        # In-place edits of the returned list cannot desync the index
+        collector.collected_articles.append(sample_articles[0])
+        assert len(collector.collected_articles) == 1
+
     @pytest.mark.asyncio
     async def test_report_to_summarizer_empty(self, collector):
         """Test report generation with no articles."""
@@ -54,3 +79,72 @@ class TestCollectorPureFunctions:
         assert "Article 0" in result
         assert "Article 2" in result
         assert "and 2 more articles" in result
+
+    def _entries(self, hours_ago):
+        """Build feed entries published the given number of hours ago."""
+        entries = []
+        for i, hours in enumerate(hours_ago):
+            entry = Mock()
+            entry.title = f"Article {i}"
+            entry.link = f"https://example.com/{i}"
+            entry.summary = ""
+            entry.published_parsed = (
+                datetime.now(timezone.utc) - timedelta(hours=hours)
+            ).timetuple()
+            entries.append(entry)
+        return entries
+
+    def test_parse_entries_stops_early_on_ordered_feed(self, collector):
+        """Test that parsing stops after a run of old entries in a newest-first feed."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+        feed = Mock()
+        feed.entries = self._entries([1, 2, 30, 31, 32, 3])
+
+        articles = collector._parse_entries("TechCrunch", feed, cutoff)
+
+        # The trailing recent entry is never reached
+        assert [a["title"] for a in articles] == ["Article 0", "Article 1"]
+
+    def test_parse_entries_scans_unordered_feed(self, collector):
+        """Test that feeds not ordered by date are scanned in full."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+        feed = Mock()
+        feed.entries = self._entries([30, 1, 31, 32, 33, 2])
+
+        articles = collector._parse_entries("TechCrunch", feed, cutoff)
+
+        assert [a["title"] for a in articles] == ["Article 1", "Article 5"]
+
+    def test_parse_entries_date_fallbacks_survive_cache_and_compact_parse(
+        self, collector, tmp_path
+    ):
+        """Test that updated-only and channel dates are kept by the feed cache and worker parse."""
+        now = datetime.now(timezone.utc)
+        data = ATOM_TEMPLATE.format(
+            old=(now - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            recent=(now - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        ).encode()
+        cutoff = now - timedelta(hours=24)
+
+        direct = feedparser.parse(data)
+        cache = FeedCache(str(tmp_path / "feeds.json"))
+        cache.store("https://example.com/atom", direct)
+        rebuilt = expand_feed(parse_feed_compact(data, {}))
+
+        for feed in (direct, cache.cached_feed("https://example.com/atom"), rebuilt):
+            collector._date_fields.clear()
+            articles = collector._parse_entries("Example", feed, cutoff)
+            assert [a["title"] for a in articles] == ["Recent"]
+
+    def test_parse_entries_ranks_undated_entries_last(self, collector):
+        """Test that entries with no date at all are kept but stamped at the window start."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+        dated, undated = self._entries([1, 2])
+        undated.published_parsed = None
+        feed = Mock()
+        feed.entries = [dated, undated]
+
+        articles = collector._parse_entries("TechCrunch", feed, cutoff)
+
+        assert articles[1].timestamp == int(cutoff.timestamp()) + 1
+        assert articles[0].timestamp > articles[1].timestamp
@@ -3,8 +3,10 @@ Component tests for TechNewsOrchestrator
 Tests orchestrator with mocked agents.
 """
 
+import feedparser
 import pytest
-from unittest.mock import AsyncMock
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
 from agents.orchestrator import TechNewsOrchestrator
 
 
@@ -44,6 +46,64 @@ class TestOrchestratorComponent:
         orchestrator.summarizer.analyze_articles.assert_called_once_with(sample_articles)
         assert result == "Analysis"
 
+    @pytest.mark.asyncio
+    async def test_run_dialog_workflow_map_reduce_uses_collected_window(
+        self, orchestrator, sample_articles
+    ):
+        """Test that map-reduce mode summarizes the whole window, not the top selection."""
+        orchestrator.config["map_reduce"] = True
+        orchestrator.collector.collect_news = AsyncMock(return_value=sample_articles[:1])
+        orchestrator.collector.articles_since = Mock(return_value=sample_articles)
+        orchestrator.collector.report_to_summarizer = AsyncMock(return_value="Report")
+        orchestrator.collector.collected_articles = sample_articles[:1]
+        orchestrator.summarizer.analyze_articles = AsyncMock(return_value="Analysis")
+
+        await orchestrator.run_dialog_workflow()
+
+        orchestrator.collector.articles_since.assert_called_once_with(
+            orchestrator.config["hours_back"], unemitted=False
+        )
+        orchestrator.summarizer.analyze_articles.assert_called_once_with(sample_articles)
+
+    @pytest.mark.asyncio
+    async def test_run_dialog_workflow_map_reduce_skips_sent_articles(
+        self, sample_config, sample_rss_feeds, tmp_path
+    ):
+        """Test that incremental map-reduce runs do not resummarize articles already sent."""
+        config = dict(
+            sample_config,
+            article_store_path=str(tmp_path / "articles.db"),
+            incremental=True,
+            map_reduce=True,
+        )
+        stories = ["Old story"]
+
+        def mock_parse(url):
+            published = (datetime.now(timezone.utc) - timedelta(hours=1)).timetuple()
+            entries = [
+                feedparser.FeedParserDict(
+                    title=title,
+                    link=f"https://example.com/{title.replace(' ', '-')}",
+                    summary="",
+                    published_parsed=published,
+                )
+                for title in stories
+            ]
+            return feedparser.FeedParserDict(entries=entries)
+
+        summarized = []
+        for run in range(2):
+            orchestrator = TechNewsOrchestrator(config, sample_rss_feeds, [])
+            orchestrator.summarizer.analyze_articles = AsyncMock(return_value="Analysis")
+            with patch("feedparser.parse", side_effect=mock_parse):
+                await orchestrator.run_dialog_workflow()
+            summarized.append(
+                [a["title"] for a in orchestrator.summarizer.analyze_articles.call_args.args[0]]
+            )
+            stories.append("New story")
+
+        assert summarized == [["Old story"], ["New story"]]
+
     @pytest.mark.asyncio
     async def test_run_dialog_workflow_empty_articles(self, orchestrator):
         """Test workflow with no articles collected."""
@@ -119,7 +179,7 @@ class TestOrchestratorComponent:
         """Test that workflow steps execute in correct order."""
         call_order = []
 
-        async def mock_collect():
+        async def mock_collect(mark_emitted=True):
             call_order.append("collect")
             return sample_articles
 
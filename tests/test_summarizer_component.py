@@ -3,8 +3,15 @@ Component tests for NewsSummarizerAgent
 Tests with mocked Gemini API.
 """
 
+import asyncio
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from tenacity import wait_none
+from agents.summarizer import PROMPT_STATIC_TOKENS, NewsSummarizerAgent
+from utils.response_cache import ResponseCache
 
 
 @pytest.mark.unit
@@ -156,3 +163,179 @@ class TestSummarizerWithMockedAPI:
             mock_get_client.reset_mock()
             await summarizer.analyze_articles(sample_articles)
             mock_get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_analyze_articles_collapses_near_duplicates(
+        self, summarizer, sample_articles, mock_gemini_response
+    ):
+        """Test that near-duplicate headlines are sent to Gemini only once."""
+        duplicate = dict(sample_articles[0], title=sample_articles[0]["title"] + " Today")
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = mock_gemini_response
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            await summarizer.analyze_articles(sample_articles + [duplicate])
+
+        prompt = mock_model.generate_content.call_args[0][0]
+        assert prompt.count("NVIDIA Announces New GPU Architecture") == 1
+
+    @pytest.mark.asyncio
+    async def test_analyze_articles_does_not_block_event_loop(
+        self, summarizer, sample_articles, mock_gemini_response
+    ):
+        """Test that other tasks keep running while Gemini generates."""
+        ticks = []
+
+        def slow_generate(*args, **kwargs):
+            time.sleep(0.3)
+            return mock_gemini_response
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0.05)
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = slow_generate
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        ticking = asyncio.create_task(ticker())
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            result = await summarizer.analyze_articles(sample_articles)
+        ticking.cancel()
+
+        assert "NVIDIA" in result
+        assert len(ticks) >= 4
+
+    @pytest.mark.asyncio
+    async def test_analyze_articles_reuses_cached_response(
+        self, summarizer, sample_articles, mock_gemini_response, tmp_path
+    ):
+        """Test that rerunning the same articles is answered from the response cache."""
+        summarizer.response_cache = ResponseCache(str(tmp_path / "responses.db"))
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = mock_gemini_response
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            first = await summarizer.analyze_articles(sample_articles)
+            second = await summarizer.analyze_articles(sample_articles)
+
+        assert first == second
+        mock_model.generate_content.assert_called_once()
+        assert summarizer.response_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_analyze_articles_map_reduce(
+        self, summarizer, sample_articles, mock_gemini_response
+    ):
+        """Test that large sets are summarized in bounded concurrent chunks, then merged."""
+        summarizer.config.update(map_reduce=True, chunk_size=1, map_concurrency=2)
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_generate(prompt, **kwargs):
+            with lock:
+                in_flight.append(prompt)
+                peak.append(len(in_flight))
+            time.sleep(0.1)
+            with lock:
+                in_flight.remove(prompt)
+            return mock_gemini_response
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = slow_generate
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            result = await summarizer.analyze_articles(sample_articles)
+
+        assert "NEW TECHNOLOGIES & PRODUCTS" in result
+        assert mock_model.generate_content.call_count == len(sample_articles) + 1
+        assert max(peak) == 2
+        reduce_prompt = mock_model.generate_content.call_args.args[0]
+        assert "📊 WEEKLY INTELLIGENCE BRIEF:" in reduce_prompt
+        assert "NVIDIA stock up 5% on strong earnings" in reduce_prompt
+        assert summarizer.prompt_stats["chunks"] == len(sample_articles)
+
+    @pytest.mark.asyncio
+    async def test_call_gemini_retries_after_timeout(self, summarizer, mock_gemini_response):
+        """Test that a call exceeding ai_timeout raises a retryable TimeoutError."""
+        summarizer.config["ai_timeout"] = 0.1
+        durations = [0.5, 0]
+
+        def generate(*args, **kwargs):
+            time.sleep(durations.pop(0))
+            return mock_gemini_response
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = generate
+        call = NewsSummarizerAgent._call_gemini_with_retry.retry_with(wait=wait_none())
+
+        response = await call(summarizer, mock_model, "prompt", MagicMock())
+
+        assert response is mock_gemini_response
+        assert mock_model.generate_content.call_count == 2
+        assert mock_model.generate_content.call_args.kwargs["request_options"] == {"timeout": 0.1}
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_cancels_queued_chunks_on_failure(self, summarizer, sample_articles):
+        """Test that a failing chunk call stops chunks that have not started yet."""
+        summarizer.config.update(map_reduce=True, chunk_size=1, map_concurrency=1)
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = Exception("Unknown error")
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            result = await summarizer.analyze_articles(sample_articles)
+
+        assert "Error creating AI summary" in result
+        assert mock_model.generate_content.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_fits_notes_into_token_budget(
+        self, summarizer, sample_articles, mock_gemini_response
+    ):
+        """Test that the merge prompt keeps only the notes that fit ai_token_budget."""
+        summarizer.config.update(map_reduce=True, chunk_size=1)
+        summarizer.config["ai_token_budget"] = (
+            PROMPT_STATIC_TOKENS + summarizer.config["ai_tokens"] + 20
+        )
+
+        def generate(prompt, **kwargs):
+            if "Key points:" not in prompt:
+                return mock_gemini_response
+            note = MagicMock()
+            note.text = f"Note on {prompt.split('News articles:')[1].split()[1]} " + "x" * 40
+            return note
+
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = generate
+
+        mock_genai = MagicMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.types.GenerationConfig = MagicMock()
+
+        with patch("agents.summarizer.get_google_ai_client", return_value=mock_genai):
+            await summarizer.analyze_articles(sample_articles)
+
+        reduce_prompt = mock_model.generate_content.call_args.args[0]
+        assert reduce_prompt.count("Note on") == 1
+        assert summarizer.prompt_stats["total_tokens"] <= summarizer.config["ai_token_budget"]
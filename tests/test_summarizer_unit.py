@@ -4,6 +4,7 @@ Tests pure functions with no external dependencies.
 """
 
 from datetime import datetime, timezone
+from agents.summarizer import PROMPT_STATIC_TOKENS
 
 
 class TestSummarizerPureFunctions:
@@ -51,6 +52,34 @@ class TestSummarizerPureFunctions:
         # Timeframe
         assert "from the last 7 days" in prompt
 
+    def test_build_prompt_is_compact_and_reports_tokens(self, summarizer):
+        """Test that prompt lines carry no indentation and token counts are recorded."""
+        articles = [{"source": "NVIDIA", "title": "New GPU"}]
+        prompt = summarizer._build_prompt(articles, days=7)
+
+        assert all(line == line.strip() for line in prompt.splitlines())
+        assert "\n\n\n" not in prompt
+        assert "- NVIDIA: New GPU" in prompt
+        stats = summarizer.prompt_stats
+        assert stats["articles"] == 1
+        assert stats["static_tokens"] + stats["article_tokens"] <= stats["total_tokens"] + 1
+
+    def test_build_prompt_packs_priority_articles_into_token_budget(self, summarizer):
+        """Test that priority company articles go first and the budget bounds the rest."""
+        articles = [{"source": "Blog", "title": f"Story {i}"} for i in range(10)]
+        articles.append({"source": "TechCrunch", "title": "Intel ships new chips"})
+        # Room for the response plus about three article lines
+        summarizer.config["ai_token_budget"] = (
+            PROMPT_STATIC_TOKENS + summarizer.config["ai_tokens"] + 15
+        )
+
+        prompt = summarizer._build_prompt(articles, days=7)
+
+        assert "Intel ships new chips" in prompt
+        assert "Story 0" in prompt
+        assert "Story 9" not in prompt
+        assert summarizer.prompt_stats["articles"] < 5
+
     def test_build_prompt_empty_articles(self, summarizer):
         """Test prompt generation with empty article list."""
         prompt = summarizer._build_prompt([], days=5)
@@ -2,9 +2,31 @@
 Unit tests for utils module
 """
 
+import asyncio
+import json
+import time
+import feedparser
+import httpx
+from datetime import datetime, timedelta, timezone
 import pytest
 from unittest.mock import patch
 from utils.ai_client import get_google_ai_client
+from utils.article import Article
+from utils.article_store import ArticleStore
+from utils.companies import company_tags
+from utils.dedup import DedupIndex, canonicalize_url, collapse_near_duplicates
+from utils.feed_cache import FeedCache
+from utils.feed_health import FeedHealth
+from utils.feed_scheduler import FeedScheduler, typical_gap
+from utils.http_client import get_url
+from utils.rate_limit import HostRateLimiter
+from utils.response_cache import ResponseCache, request_key
+from utils.source_index import SourceIndex
+from utils.text_cleaner import clean_summary
+from utils.time_index import TimeWindowIndex
+from utils.timestamps import TimestampNormalizer
+from utils.tokens import estimate_tokens, pack
+from utils.topk import TopKSelector
 
 
 class TestAIClient:
@@ -33,3 +55,517 @@ class TestAIClient:
             with patch("builtins.__import__", side_effect=ImportError):
                 with pytest.raises(ImportError, match="Install: pip install google-generativeai"):
                     get_google_ai_client()
+
+
+class TestFeedCache:
+    """Tests for the conditional GET feed cache."""
+
+    def _feed(self, **kwargs):
+        entry = feedparser.FeedParserDict(
+            title="Cached Article",
+            link="https://example.com/cached",
+            summary="Cached summary",
+            published_parsed=time.gmtime(1_700_000_000),
+        )
+        return feedparser.FeedParserDict(entries=[entry], status=200, **kwargs)
+
+    def test_round_trip_validators_and_entries(self, tmp_path):
+        """Test that validators and entries survive a save/load cycle."""
+        path = tmp_path / "feeds.json"
+        cache = FeedCache(str(path))
+        cache.store("https://example.com/rss", self._feed(etag='"abc"', modified="Mon, 01 Jan"))
+        cache.save()
+
+        reloaded = FeedCache(str(path))
+        assert reloaded.validators("https://example.com/rss") == {
+            "etag": '"abc"',
+            "modified": "Mon, 01 Jan",
+        }
+        feed = reloaded.cached_feed("https://example.com/rss")
+        assert feed.entries[0].title == "Cached Article"
+        assert feed.entries[0].published_parsed[:6] == time.gmtime(1_700_000_000)[:6]
+
+    def test_feed_without_validators_sends_none(self, tmp_path):
+        """Test that feeds with no ETag or Last-Modified get no conditional headers."""
+        cache = FeedCache(str(tmp_path / "feeds.json"))
+        cache.store("https://example.com/rss", self._feed())
+
+        assert cache.validators("https://example.com/rss") == {}
+        assert cache.cached_feed("https://example.com/rss").entries[0].title == "Cached Article"
+        assert cache.cached_feed("https://example.com/unknown") is None
+
+
+class TestTopKSelector:
+    """Tests for bounded top-K article selection."""
+
+    def _article(self, source, hours_ago):
+        published = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+        return {"source": source, "title": f"{source} {hours_ago}h", "published": published}
+
+    def test_keeps_k_newest_in_order(self):
+        """Test that only the K newest articles are kept, newest first."""
+        selector = TopKSelector(3)
+        for hours in [5, 1, 9, 3, 7, 2]:
+            selector.push(self._article("TechCrunch", hours))
+
+        assert len(selector) == 3
+        assert [a["title"] for a in selector.results()] == [
+            "TechCrunch 1h",
+            "TechCrunch 2h",
+            "TechCrunch 3h",
+        ]
+
+    def test_per_source_quota(self):
+        """Test that a per-source quota stops one busy feed from taking every slot."""
+        selector = TopKSelector(3, per_source=1)
+        for hours in [1, 2, 3]:
+            selector.push(self._article("The Verge", hours))
+        selector.push(self._article("NVIDIA", 10))
+
+        assert [a["title"] for a in selector.results()] == ["The Verge 1h", "NVIDIA 10h"]
+
+
+class TestDedup:
+    """Tests for link canonicalization and the dedup index."""
+
+    def test_canonicalize_url_variants(self):
+        """Test that scheme, host case, tracking params and trailing slashes are normalized."""
+        expected = "https://example.com/story?id=7"
+        assert canonicalize_url("https://example.com/story?id=7") == expected
+        assert canonicalize_url("http://WWW.Example.com/story/?utm_source=rss&id=7") == expected
+        assert canonicalize_url("https://example.com:443/story?id=7#comments") == expected
+
+    def test_canonicalize_url_keeps_meaningful_query(self):
+        """Test that non-tracking query parameters still distinguish links."""
+        assert canonicalize_url("https://example.com/?p=1") != canonicalize_url(
+            "https://example.com/?p=2"
+        )
+
+    def test_canonicalize_url_tolerates_malformed_links(self):
+        """Test that unparseable links are kept as-is instead of raising."""
+        assert canonicalize_url(" http://example.com:80a/x ") == "http://example.com:80a/x"
+        assert canonicalize_url("http://[::1/x") == "http://[::1/x"
+        index = DedupIndex()
+        assert index.add("http://example.com:80a/x")
+        assert not index.add("http://example.com:80a/x")
+
+    def test_dedup_index_counts_duplicates(self):
+        """Test that the index keeps the first copy and counts the rest."""
+        index = DedupIndex()
+        assert index.add("https://example.com/a")
+        assert not index.add("https://example.com/a/?utm_medium=social")
+        assert index.add("https://example.com/b")
+
+        assert index.unique == 2
+        assert index.duplicates == 1
+        assert "http://example.com/b" in index
+
+    def test_collapse_near_duplicates_keeps_first_of_cluster(self):
+        """Test that syndicated rewrites of a headline collapse to the first copy."""
+        articles = [
+            {"title": "NVIDIA unveils Blackwell Ultra GPU for AI data centers", "summary": ""},
+            {"title": "Intel names new CEO amid foundry restructuring", "summary": ""},
+            {"title": "NVIDIA unveils Blackwell Ultra GPU for AI data centers today"},
+        ]
+
+        result = collapse_near_duplicates(articles)
+
+        assert result == articles[:2]
+        assert collapse_near_duplicates(articles, threshold=0) == articles
+
+
+class TestArticle:
+    """Tests for the compact Article record."""
+
+    def test_dict_compatible_access(self, sample_article):
+        """Test that an Article reads like the original article dict."""
+        sample_article["published"] = sample_article["published"].replace(microsecond=0)
+        article = Article(**sample_article)
+
+        assert article["title"] == sample_article["title"]
+        assert article.get("summary") == sample_article["summary"]
+        assert article.get("missing", "default") == "default"
+        assert "link" in article and "missing" not in article
+        assert dict(article) == sample_article == article.to_dict()
+        with pytest.raises(KeyError):
+            article["missing"]
+
+    def test_slotted_and_source_interned(self, sample_article):
+        """Test that articles carry no per-instance dict and share source strings."""
+        first = Article(**sample_article)
+        second = Article(**dict(sample_article, source="".join(["Tech", "Crunch"])))
+
+        assert not hasattr(first, "__dict__")
+        assert first.source is second.source
+
+    def test_timestamp_and_published_agree(self):
+        """Test that the epoch timestamp and the published datetime describe the same time."""
+        article = Article("NVIDIA", "Title", "https://example.com", 1_700_000_000)
+
+        assert article.timestamp == 1_700_000_000
+        assert article.published == datetime.fromtimestamp(1_700_000_000, timezone.utc)
+        assert Article("NVIDIA", "Title", "https://example.com", article.published) == article
+
+
+class TestArticleStore:
+    """Tests for the SQLite article history."""
+
+    def test_add_new_skips_emitted_links_across_reopen(self, tmp_path, sample_article):
+        """Test that emitted canonical links are not reported as new, even after reopening."""
+        path = str(tmp_path / "articles.db")
+        store = ArticleStore(path)
+        assert store.add_new([Article(**sample_article)]) == [Article(**sample_article)]
+        # Recorded but never emitted: still new
+        assert store.add_new([Article(**sample_article)]) == [Article(**sample_article)]
+        store.mark_emitted([Article(**sample_article)])
+        store.close()
+
+        store = ArticleStore(path)
+        repeat = Article(**dict(sample_article, link=sample_article["link"] + "/?utm_source=x"))
+        assert store.add_new([repeat]) == []
+        assert len(store) == 1
+
+    def test_query_by_window_and_source(self, tmp_path, sample_articles):
+        """Test windowed queries filtered by source, newest first."""
+        store = ArticleStore(str(tmp_path / "articles.db"))
+        store.add_new(Article(**a) for a in sample_articles)
+
+        since = datetime.now(timezone.utc) - timedelta(hours=12)
+        assert [a.title for a in store.query(since)] == [a["title"] for a in sample_articles[:3]]
+        assert [a.source for a in store.query(since, sources=["NVIDIA"])] == ["NVIDIA"]
+        ascending = [a.timestamp for a in store.query(since, oldest_first=True)]
+        assert ascending == sorted(ascending)
+
+
+class TestFeedScheduler:
+    """Tests for the adaptive feed polling scheduler."""
+
+    def _feed(self, gap_seconds, date_field="published_parsed", **channel):
+        entries = [
+            feedparser.FeedParserDict({date_field: time.gmtime(1_700_000_000 - i * gap_seconds)})
+            for i in range(5)
+        ]
+        return feedparser.FeedParserDict(entries=entries, feed=feedparser.FeedParserDict(channel))
+
+    def test_unknown_feed_is_due(self, tmp_path):
+        """Test that a feed never polled before is always due."""
+        scheduler = FeedScheduler(str(tmp_path / "schedule.json"))
+        assert scheduler.is_due("https://example.com/rss")
+
+    def test_learns_publish_interval(self, tmp_path):
+        """Test that slow feeds are polled rarely and busy feeds at the minimum interval."""
+        scheduler = FeedScheduler(str(tmp_path / "schedule.json"), min_interval=600)
+        scheduler.record("https://slow.example/rss", self._feed(2 * 86400), now=0)
+        scheduler.record("https://busy.example/rss", self._feed(300), now=0)
+
+        assert scheduler.poll_interval("https://slow.example/rss") == 86400
+        assert scheduler.poll_interval("https://busy.example/rss") == 600
+        assert not scheduler.is_due("https://slow.example/rss", now=3600)
+        assert scheduler.is_due("https://busy.example/rss", now=3600)
+
+    def test_learns_interval_from_updated_only_feed(self, tmp_path):
+        """Test that Atom feeds carrying only <updated> dates are learned from too."""
+        scheduler = FeedScheduler(str(tmp_path / "schedule.json"), min_interval=600)
+        scheduler.record("https://atom.example/feed", self._feed(3600, "updated_parsed"), now=0)
+
+        assert typical_gap(self._feed(3600, "updated_parsed")) == 3600
+        assert scheduler.poll_interval("https://atom.example/feed") == 1800
+
+    def test_honors_feed_hints_and_persists(self, tmp_path):
+        """Test that <ttl> and sy:updatePeriod hints set a floor and survive a reload."""
+        path = str(tmp_path / "schedule.json")
+        scheduler = FeedScheduler(path, min_interval=60)
+        scheduler.record("https://ttl.example/rss", self._feed(60, ttl="120"), now=0)
+        scheduler.record(
+            "https://sy.example/rss",
+            self._feed(60, sy_updateperiod="daily", sy_updatefrequency="4"),
+            now=0,
+        )
+        scheduler.save()
+
+        reloaded = FeedScheduler(path, min_interval=60)
+        assert reloaded.poll_interval("https://ttl.example/rss") == 7200
+        assert reloaded.poll_interval("https://sy.example/rss") == 21600
+
+
+class TestHostRateLimiter:
+    """Tests for the per-host politeness limiter."""
+
+    @pytest.mark.asyncio
+    async def test_rate_applies_per_host(self):
+        """Test that requests beyond the burst wait for tokens, per host only."""
+        limiter = HostRateLimiter(rate=10, burst=2)
+
+        async def fetch(url):
+            async with limiter.limit(url):
+                pass
+
+        start = time.monotonic()
+        await asyncio.gather(*(fetch("https://a.example/feed") for _ in range(4)))
+        await fetch("https://b.example/feed")
+
+        # 4 requests at 10/s with a burst of 2 need two extra 0.1s tokens
+        assert 0.15 <= time.monotonic() - start < 0.4
+        assert limiter.wait_times["a.example"] > 0.15
+        assert limiter.wait_times["b.example"] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_max_in_flight(self):
+        """Test that concurrent requests to one host are capped."""
+        limiter = HostRateLimiter(max_in_flight=2)
+        active, peak = 0, 0
+
+        async def fetch():
+            nonlocal active, peak
+            async with limiter.limit("https://a.example/feed"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(fetch() for _ in range(5)))
+        assert peak == 2
+
+
+class TestFeedHealth:
+    """Tests for feed health tracking and the circuit breaker."""
+
+    def test_breaker_opens_then_probes_after_cooldown(self, tmp_path):
+        """Test closed -> open -> half-open -> closed transitions."""
+        health = FeedHealth(str(tmp_path / "health.json"), failure_threshold=2, cooldown=60)
+        url = "https://dead.example/rss"
+
+        health.record_failure(url, now=0)
+        assert health.allow(url, now=1)
+        health.record_failure(url, now=1)
+        assert health.state(url) == "open"
+        assert not health.allow(url, now=30)
+
+        assert health.allow(url, now=61)
+        assert health.state(url) == "half_open"
+        health.record_success(url, latency=0.5)
+        assert health.state(url) == "closed"
+        assert health.latency(url) == 0.5
+
+    def test_failed_probe_reopens_and_state_persists(self, tmp_path):
+        """Test that a failed half-open probe reopens the breaker, surviving a reload."""
+        path = str(tmp_path / "health.json")
+        health = FeedHealth(path, failure_threshold=1, cooldown=60)
+        url = "https://dead.example/rss"
+        health.record_failure(url, now=0)
+        assert health.allow(url, now=100)
+        health.record_failure(url, now=100)
+        health.save()
+
+        reloaded = FeedHealth(path, failure_threshold=1, cooldown=60)
+        assert reloaded.state(url) == "open"
+        assert not reloaded.allow(url, now=150)
+
+
+class TestPersistedState:
+    """Tests for the shared JSON state file."""
+
+    def test_save_writes_only_changed_state(self, tmp_path):
+        """Test that clean state is not written and changed state survives a reload."""
+        path = tmp_path / "state" / "health.json"
+        health = FeedHealth(str(path))
+        health.save()
+        assert not path.exists()
+
+        health.record_failure("https://dead.example/rss", now=0)
+        health.save()
+        assert FeedHealth(str(path)).state("https://dead.example/rss") == "closed"
+        assert json.loads(path.read_text())["https://dead.example/rss"]["failures"] == 1
+
+    def test_unreadable_file_starts_empty(self, tmp_path):
+        """Test that a corrupt state file is ignored instead of failing the run."""
+        path = tmp_path / "schedule.json"
+        path.write_text("{not json")
+        scheduler = FeedScheduler(str(path))
+        assert scheduler.is_due("https://example.com/rss")
+
+
+class TestHttpClient:
+    """Tests for the pooled HTTP client helpers."""
+
+    @pytest.mark.asyncio
+    async def test_get_url_maps_transport_errors(self):
+        """Test that httpx timeouts and connection errors surface as builtin exceptions."""
+
+        def handler(request):
+            if "slow" in request.url.host:
+                raise httpx.ReadTimeout("timed out", request=request)
+            raise httpx.ConnectError("refused", request=request)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(TimeoutError):
+                await get_url(client, "https://slow.example/rss")
+            with pytest.raises(ConnectionError):
+                await get_url(client, "https://down.example/rss")
+
+
+class TestTimestampNormalizer:
+    """Tests for feed entry timestamp normalization."""
+
+    def test_falls_back_to_updated_then_feed_date(self):
+        """Test the published -> updated -> feed-level fallback chain."""
+        feed = feedparser.FeedParserDict(
+            feed=feedparser.FeedParserDict(updated_parsed=time.gmtime(1_600_000_000))
+        )
+        normalize = TimestampNormalizer(feed)
+
+        published = feedparser.FeedParserDict(published_parsed=time.gmtime(1_700_000_000))
+        updated = feedparser.FeedParserDict(updated_parsed=time.gmtime(1_650_000_000))
+        undated = feedparser.FeedParserDict(title="No date")
+
+        assert normalize(published) == 1_700_000_000
+        assert normalize(updated) == 1_650_000_000
+        assert normalize(undated) == 1_600_000_000
+
+    def test_remembers_detected_field(self):
+        """Test that the date field detected for a feed is tried first afterwards."""
+        normalize = TimestampNormalizer()
+        assert normalize.field is None
+
+        normalize(feedparser.FeedParserDict(updated_parsed=time.gmtime(1_700_000_000)))
+        assert normalize.field == "updated_parsed"
+        assert TimestampNormalizer(field="updated_parsed")(feedparser.FeedParserDict()) is None
+
+
+class TestCleanSummary:
+    """Tests for ingest-time summary cleanup."""
+
+    def test_strips_markup_and_entities(self):
+        """Test that tags, scripts, styles and comments are removed and entities decoded."""
+        raw = (
+            '<div class="x"><img src="a.png"/><p>GPU&nbsp;sales &amp; AI</p>'
+            "<script>track();</script><style>p {}</style><!-- ad -->\n\n<b>soar</b></div>"
+        )
+        assert clean_summary(raw) == "GPU sales & AI soar"
+
+    def test_truncates_at_word_boundary(self):
+        """Test that long summaries are cut on a word boundary within the budget."""
+        result = clean_summary("NVIDIA announces new datacenter GPU today", max_chars=20)
+
+        assert result == "NVIDIA announces…"
+        assert len(result) <= 20
+        assert clean_summary("short", max_chars=20) == "short"
+
+    def test_non_string_input(self):
+        """Test that missing or non-string summaries become empty strings."""
+        assert clean_summary(None) == ""
+
+
+class TestSourceIndex:
+    """Tests for the maintained source / company / day index."""
+
+    def test_facets(self, sample_articles):
+        """Test per-source counts, newest times, company tags and day buckets."""
+        index = SourceIndex(sample_articles)
+
+        assert index.counts() == {"TechCrunch": 2, "The Verge": 1, "NVIDIA": 1}
+        assert index.newest("TechCrunch") == sample_articles[0]["published"]
+        assert index.newest("Unknown") is None
+        assert index.company_counts() == {"NVIDIA": 2, "Intel": 1, "AMD": 1}
+        assert sum(index.day_counts().values()) == len(index) == 4
+
+    def test_incremental_add_and_clear(self, sample_articles):
+        """Test that adding articles updates the facets and clear empties them."""
+        index = SourceIndex(sample_articles[:1])
+        index.add(sample_articles[2])
+
+        assert index.count("NVIDIA") == 1
+        assert [a["title"] for a in index.by_company("NVIDIA")] == [
+            sample_articles[0]["title"],
+            sample_articles[2]["title"],
+        ]
+        index.clear()
+        assert index.counts() == {} and len(index) == 0
+
+
+class TestTimeWindowIndex:
+    """Tests for the publish-time window index."""
+
+    def _articles(self):
+        return [
+            Article("NVIDIA", "N1", "https://example.com/n1", 1000),
+            Article("Intel", "I1", "https://example.com/i1", 3000),
+            Article("NVIDIA", "N2", "https://example.com/n2", 2000),
+            Article("TechCrunch", "T1", "https://example.com/t1", 4000),
+        ]
+
+    def test_query_window_newest_first(self):
+        """Test that a window query returns only newer articles, newest first."""
+        index = TimeWindowIndex(self._articles())
+
+        assert [a.title for a in index.query(1500)] == ["T1", "I1", "N2"]
+        assert index.query(5000) == []
+
+    def test_query_by_sources_merges_in_order(self):
+        """Test that source-filtered queries merge the per-source arrays by time."""
+        index = TimeWindowIndex(self._articles())
+
+        assert [a.title for a in index.query(0, ["NVIDIA", "Intel"])] == ["I1", "N2", "N1"]
+        assert index.query(0, ["Unknown"]) == []
+
+    def test_duplicate_links_are_ignored(self):
+        """Test that re-adding a story with a tracking-param link does not duplicate it."""
+        index = TimeWindowIndex(self._articles())
+        assert not index.add(Article("NVIDIA", "N1", "https://example.com/n1?utm_source=x", 1000))
+        assert len(index) == 4
+
+
+class TestResponseCache:
+    """Tests for the content-addressed AI response cache."""
+
+    def test_hit_miss_and_ttl(self, tmp_path):
+        """Test that lookups count hits and misses and expired entries are misses."""
+        cache = ResponseCache(str(tmp_path / "responses.db"), ttl=60)
+        key = request_key("model", "prompt", 0.7, 2000)
+        assert key != request_key("model", "prompt", 0.5, 2000)
+
+        assert cache.get(key) is None
+        cache.put(key, "summary")
+        assert cache.get(key) == "summary"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        with patch("utils.response_cache.time.time", return_value=time.time() + 120):
+            assert cache.get(key) is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that entries beyond max_bytes are evicted, least recently read first."""
+        cache = ResponseCache(str(tmp_path / "responses.db"), ttl=0, max_bytes=10)
+        with patch("utils.response_cache.time.time", side_effect=[1, 2, 3, 4]):
+            cache.put("a", "aaaa")
+            cache.put("b", "bbbb")
+            cache.get("a")
+            cache.put("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+
+
+class TestTokens:
+    """Tests for token estimation and budget packing."""
+
+    def test_pack_skips_items_that_do_not_fit(self):
+        """Test greedy packing keeps order, skips oversized items and honors the limit."""
+        assert estimate_tokens("abcdefgh") == 2
+        assert pack(["aaaa", "b" * 40, "cccc", "dddd"], budget=2, cost=estimate_tokens) == [
+            "aaaa",
+            "cccc",
+        ]
+        assert pack(["a", "b", "c"], budget=10, cost=len, limit=2) == ["a", "b"]
+
+
+class TestCompanyTags:
+    """Tests for tagging articles with the companies they are about."""
+
+    def test_tags_by_source_and_title(self):
+        """Test that a company feed or a title mention tags an article, in list order."""
+        article = {"source": "OpenAI", "title": "nvidia and Intel sign a deal"}
+        assert company_tags(article) == ["NVIDIA", "Intel", "OpenAI"]
+        assert company_tags(article, ["Intel"]) == ["Intel"]
+        assert company_tags({"source": "Blog", "title": "Intelligence"}) == []
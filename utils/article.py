@@ -0,0 +1,74 @@
+"""
+Compact article record shared by the collector, summarizer and email agents.
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Union
+
+# Field names exposed through dict-style access
+ARTICLE_FIELDS = ("source", "title", "link", "published", "summary")
+
+
+@dataclass(slots=True, init=False)
+class Article:
+    """A collected news article.
+
+    Slotted to avoid a per-instance ``__dict__``, with ``source`` interned so every article
+    from the same feed shares one string. The publish time is stored as UTC epoch seconds
+    in ``timestamp`` (so sorting and windowing compare plain integers) and exposed as an
+    aware datetime through ``published``. Supports read-only dict-style access
+    (``article["title"]``, ``article.get("summary")``, ``"link" in article``) so code
+    written against the original article dicts keeps working.
+    """
+
+    source: str
+    title: str
+    link: str
+    timestamp: int
+    summary: str
+
+    def __init__(
+        self,
+        source: str,
+        title: str,
+        link: str,
+        published: Union[datetime, int, float],
+        summary: str = "",
+    ):
+        self.source = sys.intern(source)
+        self.title = title
+        self.link = link
+        self.timestamp = int(
+            published.timestamp() if isinstance(published, datetime) else published
+        )
+        self.summary = summary
+
+    @property
+    def published(self) -> datetime:
+        """Publish time as a timezone-aware UTC datetime."""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in ARTICLE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in ARTICLE_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ARTICLE_FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field value, or default if the key is not an article field."""
+        return getattr(self, key) if key in ARTICLE_FIELDS else default
+
+    def keys(self):
+        """Return the field names, like dict.keys()."""
+        return ARTICLE_FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the article as a plain dict."""
+        return {key: getattr(self, key) for key in ARTICLE_FIELDS}
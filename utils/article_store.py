@@ -0,0 +1,130 @@
+"""
+Persistent article history.
+SQLite store of every collected article, keyed by canonical link, so runs can emit only
+articles that were not emitted before and history can be queried by time window.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+from utils.article import Article
+from utils.dedup import canonicalize_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link_key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    published REAL NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    first_seen REAL NOT NULL,
+    emitted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS idx_articles_source_published ON articles (source, published);
+"""
+
+
+class ArticleStore:
+    """SQLite-backed history of collected articles keyed by canonical link.
+
+    Every collected article is recorded, but an article only counts as seen once it is
+    marked as emitted (selected for, or delivered in, a newsletter).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def add_new(self, articles: Iterable[Article]) -> List[Article]:
+        """Record articles in the history and return the ones not emitted in any earlier run."""
+        now = datetime.now(timezone.utc).timestamp()
+        new = []
+        for article in articles:
+            key = canonicalize_url(article["link"])
+            self._conn.execute(
+                "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (
+                    key,
+                    article["source"],
+                    article["title"],
+                    article["link"],
+                    article["published"].timestamp(),
+                    article.get("summary") or "",
+                    now,
+                ),
+            )
+            emitted = self._conn.execute(
+                "SELECT emitted FROM articles WHERE link_key = ?", (key,)
+            ).fetchone()[0]
+            if not emitted:
+                new.append(article)
+        return new
+
+    def mark_emitted(self, articles: Iterable[Article]) -> None:
+        """Mark articles as emitted, so later ``add_new`` calls no longer return them."""
+        self._conn.executemany(
+            "UPDATE articles SET emitted = 1 WHERE link_key = ?",
+            [(canonicalize_url(article["link"]),) for article in articles],
+        )
+
+    def unemitted(self, articles: Iterable[Article]) -> List[Article]:
+        """Return the articles that have not been marked as emitted, in their given order."""
+        articles = list(articles)
+        keys = [canonicalize_url(article["link"]) for article in articles]
+        emitted = set()
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            emitted.update(
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT link_key FROM articles WHERE emitted = 1 AND link_key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+            )
+        return [article for article, key in zip(articles, keys) if key not in emitted]
+
+    def query(
+        self,
+        since: datetime,
+        sources: Optional[Iterable[str]] = None,
+        oldest_first: bool = False,
+    ) -> List[Article]:
+        """Return stored articles published after ``since``, newest first.
+
+        Args:
+            since: Exclusive lower bound on the publish time
+            sources: Only include these sources (all sources if None)
+            oldest_first: Return the articles in ascending publish order instead
+        """
+        sql = "SELECT source, title, link, published, summary FROM articles WHERE published > ?"
+        params = [since.timestamp()]
+        if sources is not None:
+            sources = list(sources)
+            sql += f" AND source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += " ORDER BY published " + ("ASC" if oldest_first else "DESC")
+
+        return [
+            Article(source, title, link, datetime.fromtimestamp(published, timezone.utc), summary)
+            for source, title, link, published, summary in self._conn.execute(sql, params)
+        ]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def commit(self) -> None:
+        """Persist pending inserts to disk."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Commit and close the database connection."""
+        self._conn.commit()
+        self._conn.close()
@@ -0,0 +1,43 @@
+"""
+Company tagging for articles.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import PRIORITY_COMPANIES
+
+
+@lru_cache(maxsize=None)
+def _matcher(companies: Tuple[str, ...]) -> Tuple[Optional[re.Pattern], Dict[str, str]]:
+    """Compile the title pattern and lowercase -> canonical name map for a company list."""
+    pattern = (
+        re.compile(r"\b(" + "|".join(map(re.escape, companies)) + r")\b", re.IGNORECASE)
+        if companies
+        else None
+    )
+    return pattern, {company.lower(): company for company in companies}
+
+
+def company_tags(article, companies: Iterable[str] = PRIORITY_COMPANIES) -> List[str]:
+    """Return the companies an article is about, in the order of ``companies``.
+
+    An article is about a company when it comes from that company's feed or mentions the
+    company name in its title.
+
+    Args:
+        article: Article or article dict with ``source`` and ``title``
+        companies: Company names to look for
+
+    Returns:
+        Matching company names
+    """
+    companies = tuple(companies)
+    pattern, canonical = _matcher(companies)
+    tags = set()
+    if article["source"] in canonical.values():
+        tags.add(article["source"])
+    if pattern is not None:
+        for match in pattern.findall(article.get("title") or ""):
+            tags.add(canonical[match.lower()])
+    return [company for company in companies if company in tags]
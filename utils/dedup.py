@@ -0,0 +1,155 @@
+"""
+Article deduplication helpers.
+Canonicalizes article links so the same story syndicated across feeds is kept once,
+and fingerprints headlines so near-identical rewrites of a story can be collapsed.
+"""
+
+import hashlib
+import random
+import re
+from typing import Dict, List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the referrer and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# MinHash parameters: 16 bands of 4 rows put the LSH candidate threshold near 0.5 Jaccard
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+_ROWS = MINHASH_PERMUTATIONS // MINHASH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(_MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+_WORD_RE = re.compile(r"\w+")
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a link so trivially different URLs of the same story compare equal.
+
+    Treats http and https as the same scheme, lowercases the host, drops default ports,
+    ``www.`` prefixes, fragments, ``utm_*`` and other tracking parameters, sorts the
+    remaining query parameters and strips trailing slashes. Links that cannot be parsed
+    (bad port, malformed IPv6 host) are returned stripped but otherwise unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    if scheme in DEFAULT_PORTS:
+        scheme = "https"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def link_fingerprint(url: str) -> bytes:
+    """Return a compact 8-byte hash of the canonical form of a link."""
+    return hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=8).digest()
+
+
+class DedupIndex:
+    """Set of canonical link hashes with counters for kept and dropped articles."""
+
+    def __init__(self):
+        self._seen = set()
+        self.unique = 0
+        self.duplicates = 0
+
+    def add(self, url: str) -> bool:
+        """Record a link. Returns True the first time a story is seen, False for duplicates."""
+        fingerprint = link_fingerprint(url)
+        if fingerprint in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(fingerprint)
+        self.unique += 1
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return link_fingerprint(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+def _features(text: str) -> Set[str]:
+    """Split text into lowercase word unigrams and bigrams."""
+    words = _WORD_RE.findall(text.lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """Return a MinHash signature of the text's word shingles.
+
+    The fraction of positions where two signatures agree estimates the Jaccard
+    similarity of the two shingle sets.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+        for f in _features(text)
+    ]
+    if not hashes:
+        return (_MERSENNE_PRIME,) * MINHASH_PERMUTATIONS
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def find_near_duplicates(articles: List, threshold: float = 0.6) -> List[List[int]]:
+    """Cluster articles whose title + summary shingles have Jaccard similarity >= threshold.
+
+    Uses MinHash signatures with LSH banding: only articles whose signatures agree on at
+    least one whole band become candidate pairs, so the work stays sub-quadratic instead
+    of comparing every pair.
+
+    Returns:
+        Clusters of article indices, each in input order; singletons included
+    """
+    signatures = [minhash(f"{a['title']} {a.get('summary') or ''}") for a in articles]
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[tuple, List[int]] = {}
+    for i, signature in enumerate(signatures):
+        for band in range(MINHASH_BANDS):
+            key = (band, signature[band * _ROWS : (band + 1) * _ROWS])
+            for j in buckets.setdefault(key, []):
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                agree = sum(x == y for x, y in zip(signature, signatures[j]))
+                if agree >= threshold * MINHASH_PERMUTATIONS:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+            buckets[key].append(i)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def collapse_near_duplicates(articles: List, threshold: float = 0.6) -> List:
+    """Keep one representative (the first in input order) per near-duplicate cluster."""
+    if not threshold or len(articles) < 2:
+        return list(articles)
+    keep = sorted(cluster[0] for cluster in find_near_duplicates(articles, threshold))
+    return [articles[i] for i in keep]
@@ -0,0 +1,100 @@
+"""
+Conditional GET cache for RSS feeds.
+Stores ETag / Last-Modified validators and the last parsed entries per feed URL,
+so unchanged feeds can be answered from disk after a 304 Not Modified response.
+"""
+
+import time
+from typing import Dict, Optional
+import feedparser
+from utils.persisted_state import PersistedState
+from utils.timestamps import CHANNEL_DATE_FIELDS, DATE_FIELDS
+
+# Entry fields kept in the cache - everything the collector reads from an entry
+ENTRY_FIELDS = ("title", "link", "summary") + DATE_FIELDS
+
+
+def _dates_to_lists(values: Dict, fields) -> Dict:
+    """Return a copy of ``values`` with time tuples in ``fields`` as JSON-friendly lists."""
+    return {
+        key: list(value[:9]) if key in fields and value else value for key, value in values.items()
+    }
+
+
+def _dates_to_struct(values: Dict, fields) -> feedparser.FeedParserDict:
+    """Rebuild a FeedParserDict with the cached date lists in ``fields`` as struct_time."""
+    return feedparser.FeedParserDict(
+        {
+            key: time.struct_time(value) if key in fields and value else value
+            for key, value in values.items()
+        }
+    )
+
+
+def compact_feed(feed: feedparser.FeedParserDict, channel_fields=CHANNEL_DATE_FIELDS) -> Dict:
+    """Keep only the entry fields the collector reads, plus ``channel_fields`` of the channel.
+
+    Returns plain dicts with dates as lists, so the result is both JSON-friendly and cheap
+    to pickle. ``expand_feed`` turns it back into a parsed feed.
+    """
+    # dict.get skips FeedParserDict's deprecated updated -> published key alias
+    channel = feed.get("feed") or {}
+    return {
+        "feed": _dates_to_lists(
+            {field: value for field in channel_fields if (value := dict.get(channel, field))},
+            CHANNEL_DATE_FIELDS,
+        ),
+        "entries": [
+            _dates_to_lists(
+                {field: value for field in ENTRY_FIELDS if (value := dict.get(entry, field))},
+                DATE_FIELDS,
+            )
+            for entry in feed.entries
+        ],
+    }
+
+
+def expand_feed(compact: Dict, **extra) -> feedparser.FeedParserDict:
+    """Rebuild a parsed feed from ``compact_feed`` output, adding any ``extra`` keys."""
+    return feedparser.FeedParserDict(
+        feed=_dates_to_struct(compact.get("feed", {}), CHANNEL_DATE_FIELDS),
+        entries=[_dates_to_struct(entry, DATE_FIELDS) for entry in compact.get("entries", [])],
+        **extra,
+    )
+
+
+class FeedCache(PersistedState):
+    """Persistent per-feed cache of HTTP validators and last parsed entries."""
+
+    description = "feed cache"
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Return the feedparser keyword arguments (etag / modified) for a conditional GET."""
+        cached = self._feeds.get(url, {})
+        return {key: cached[key] for key in ("etag", "modified") if cached.get(key)}
+
+    def store(self, url: str, feed: feedparser.FeedParserDict) -> None:
+        """Remember the validators and entries of a freshly downloaded feed.
+
+        Entries are kept even without validators, so feeds skipped by the polling
+        scheduler can still be served from the cache.
+        """
+        if feed.get("bozo") and not feed.entries:
+            return
+
+        compact = compact_feed(feed)
+        with self._lock:
+            self._feeds[url] = {
+                "etag": feed.get("etag"),
+                "modified": feed.get("modified"),
+                **compact,
+            }
+            self._dirty = True
+
+    def cached_feed(self, url: str) -> Optional[feedparser.FeedParserDict]:
+        """Rebuild a parsed feed from the cached entries, or None if the URL is unknown."""
+        cached = self._feeds.get(url)
+        if cached is None:
+            return None
+
+        return expand_feed(cached, status=304)
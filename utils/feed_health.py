@@ -0,0 +1,85 @@
+"""
+Feed health tracking with a per-feed circuit breaker.
+Persists failure counts and latency across runs so dead or erroring feeds stop costing
+fetch time and retry backoff on every run.
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from utils.persisted_state import PersistedState
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class FeedHealth(PersistedState):
+    """Per-feed health state: consecutive failures, latency EWMA and circuit breaker.
+
+    A feed's breaker opens after ``failure_threshold`` consecutive failures. While open,
+    the feed is skipped; after ``cooldown`` seconds it goes half-open and one probe fetch
+    is allowed. A successful probe closes the breaker, a failed one reopens it.
+    """
+
+    description = "feed health state"
+
+    def __init__(
+        self,
+        path: str,
+        failure_threshold: int = 3,
+        cooldown: float = 6 * 3600,
+        alpha: float = 0.3,
+    ):
+        super().__init__(path)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+
+    def _state(self, url: str) -> Dict:
+        self._dirty = True
+        return self._feeds.setdefault(url, {"state": CLOSED, "failures": 0})
+
+    def state(self, url: str) -> str:
+        """Return the breaker state of a feed (closed, open or half_open)."""
+        return self._feeds.get(url, {}).get("state", CLOSED)
+
+    def latency(self, url: str) -> Optional[float]:
+        """Return the feed's smoothed fetch latency in seconds, if known."""
+        return self._feeds.get(url, {}).get("latency")
+
+    def allow(self, url: str, now: Optional[float] = None) -> bool:
+        """Return True if the feed may be fetched, moving an expired open breaker to half-open."""
+        state = self._feeds.get(url)
+        if state is None or state["state"] != OPEN:
+            return True
+        now = time.time() if now is None else now
+        if now - state["opened_at"] >= self.cooldown:
+            state["state"] = HALF_OPEN
+            self._dirty = True
+            return True
+        return False
+
+    def record_success(self, url: str, latency: float) -> None:
+        """Record a successful fetch, closing the breaker."""
+        state = self._state(url)
+        if state["state"] != CLOSED:
+            logger.info(f"Feed recovered, closing circuit: {url}")
+        state.update(state=CLOSED, failures=0)
+        previous = state.get("latency")
+        state["latency"] = (
+            latency if previous is None else self.alpha * latency + (1 - self.alpha) * previous
+        )
+
+    def record_failure(self, url: str, now: Optional[float] = None) -> None:
+        """Record a failed fetch, opening the breaker after too many in a row."""
+        state = self._state(url)
+        state["failures"] += 1
+        if state["state"] == HALF_OPEN or state["failures"] >= self.failure_threshold:
+            if state["state"] != OPEN:
+                logger.warning(f"Opening circuit after {state['failures']} failures: {url}")
+            state["state"] = OPEN
+            state["opened_at"] = time.time() if now is None else now
@@ -0,0 +1,117 @@
+"""
+Adaptive feed polling scheduler.
+Learns how often each feed publishes and honors the feed's own caching hints, so feeds
+are only polled when they are likely to have new content.
+"""
+
+import re
+import statistics
+import time
+from typing import Optional
+
+from utils.persisted_state import PersistedState
+from utils.timestamps import TimestampNormalizer
+
+# sy:updatePeriod values in seconds (RSS syndication module)
+UPDATE_PERIODS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 7 * 86400,
+    "monthly": 30 * 86400,
+    "yearly": 365 * 86400,
+}
+# Channel fields that carry polling hints
+CHANNEL_HINT_FIELDS = ("ttl", "sy_updateperiod", "sy_updatefrequency")
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def publish_hint(feed) -> float:
+    """Return the minimum polling interval (seconds) the feed asks for, or 0 if none.
+
+    Reads the HTTP ``Cache-Control: max-age``, RSS ``<ttl>`` (minutes) and
+    ``sy:updatePeriod`` / ``sy:updateFrequency`` hints and returns the largest.
+    """
+    hints = [0.0]
+    headers = {k.lower(): v for k, v in (feed.get("headers") or {}).items()}
+    match = MAX_AGE_RE.search(headers.get("cache-control", ""))
+    if match:
+        hints.append(float(match.group(1)))
+
+    channel = feed.get("feed") or {}
+    try:
+        if channel.get("ttl"):
+            hints.append(float(channel["ttl"]) * 60)
+        period = UPDATE_PERIODS.get(str(channel.get("sy_updateperiod", "")).strip().lower())
+        if period:
+            hints.append(period / max(1, int(channel.get("sy_updatefrequency") or 1)))
+    except (TypeError, ValueError):
+        pass
+    return max(hints)
+
+
+def typical_gap(feed, sample: int = 20) -> Optional[float]:
+    """Return the median gap (seconds) between the newest entries' publish times.
+
+    Entry dates are read the same way the collector reads them, so Atom feeds that only
+    carry ``<updated>`` work too.
+    """
+    # No feed-level fallback: undated entries would all share one timestamp
+    normalize = TimestampNormalizer()
+    timestamps = sorted(
+        filter(None, map(normalize, feed.get("entries", []))),
+        reverse=True,
+    )[:sample]
+    gaps = [a - b for a, b in zip(timestamps, timestamps[1:]) if a > b]
+    return statistics.median(gaps) if gaps else None
+
+
+class FeedScheduler(PersistedState):
+    """Decides which feeds are due for polling, persisting what it learns across runs."""
+
+    description = "scheduler state"
+
+    def __init__(
+        self,
+        path: str,
+        min_interval: float = 900,
+        max_interval: float = 86400,
+        alpha: float = 0.3,
+    ):
+        super().__init__(path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.alpha = alpha
+
+    def poll_interval(self, url: str) -> float:
+        """Return how long to wait between polls of a feed.
+
+        Half the learned publish interval (so new entries are picked up promptly), never
+        below the feed's own caching hint, clamped to [min_interval, max_interval].
+        """
+        state = self._feeds.get(url, {})
+        interval = max(state.get("interval", 0) / 2, state.get("hint", 0))
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def is_due(self, url: str, now: Optional[float] = None) -> bool:
+        """Return True if the feed should be polled now."""
+        state = self._feeds.get(url)
+        if not state or "last_polled" not in state:
+            return True
+        now = time.time() if now is None else now
+        return now - state["last_polled"] >= self.poll_interval(url)
+
+    def record(self, url: str, feed, now: Optional[float] = None) -> None:
+        """Record a poll of the feed and learn from its entry timestamps and hints."""
+        state = self._feeds.setdefault(url, {})
+        state["last_polled"] = time.time() if now is None else now
+        self._dirty = True
+
+        hint = publish_hint(feed)
+        if hint:
+            state["hint"] = hint
+        gap = typical_gap(feed)
+        if gap is not None:
+            previous = state.get("interval")
+            state["interval"] = (
+                gap if previous is None else self.alpha * gap + (1 - self.alpha) * previous
+            )
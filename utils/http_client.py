@@ -0,0 +1,71 @@
+"""
+Pooled HTTP Client Utility
+Creates the shared async HTTP client used to download RSS feeds.
+"""
+
+from typing import Dict, Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+USER_AGENT = "KeepMePosted/1.0 (+https://github.com/NoaKirsh/KeepMePosted)"
+
+
+def create_http_client(max_connections: int = 20, timeout: float = 30.0):
+    """Create a pooled async HTTP client for feed downloads.
+
+    The client keeps connections alive between requests (so feeds sharing a host reuse
+    one TLS session), negotiates HTTP/2 when the ``h2`` package is installed, and
+    advertises every compression scheme httpx can decode (gzip, deflate, and brotli
+    when the ``brotli`` package is installed).
+
+    Args:
+        max_connections: Maximum number of open connections across all hosts
+        timeout: Default request timeout in seconds
+
+    Returns:
+        httpx.AsyncClient: Configured client; close it with ``await client.aclose()``
+
+    Raises:
+        ImportError: If httpx package is not installed
+    """
+    if httpx is None:
+        raise ImportError("Install: pip install 'httpx[http2,brotli]'")
+
+    try:
+        import h2  # noqa: F401
+
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60,
+        ),
+        timeout=timeout,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+async def get_url(client, url: str, headers: Optional[Dict[str, str]] = None):
+    """GET a URL with the pooled client, mapping httpx transport errors to builtin ones.
+
+    Timeouts become ``TimeoutError`` and other transport failures ``ConnectionError``, so
+    callers and the retry policy handle both fetch paths the same way.
+
+    Returns:
+        httpx.Response: The response, whatever its status code
+    """
+    try:
+        return await client.get(url, headers=headers)
+    except httpx.TimeoutException as e:
+        raise TimeoutError(str(e)) from e
+    except httpx.TransportError as e:
+        raise ConnectionError(str(e)) from e
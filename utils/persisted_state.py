@@ -0,0 +1,57 @@
+"""
+Per-feed state persisted as a JSON file.
+Shared by the feed cache, polling scheduler and health tracker, which all keep a dict of
+per-URL state between runs.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class PersistedState:
+    """Per-URL state loaded from a JSON file and written back atomically.
+
+    Subclasses keep their state in ``_feeds`` and set ``_dirty`` after changing it, so
+    ``save`` skips the write when nothing changed. A missing or unreadable file starts
+    empty.
+    """
+
+    # Used in the warning logged for an unreadable file
+    description = "state"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load the state file, starting empty if it is missing or unreadable."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._feeds = json.load(f)
+        except FileNotFoundError:
+            self._feeds = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.description} {self.path}: {e}")
+            self._feeds = {}
+
+    def save(self) -> None:
+        """Write the state to disk atomically if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._feeds, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
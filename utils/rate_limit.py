@@ -0,0 +1,59 @@
+"""
+Per-host politeness limiter for feed fetching.
+"""
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """Token-bucket rate limit plus an in-flight cap, tracked separately for each host.
+
+    Each host gets ``rate`` requests per second with bursts of up to ``burst`` requests,
+    and at most ``max_in_flight`` concurrent requests. Time spent waiting is accumulated
+    per host in ``wait_times``.
+    """
+
+    def __init__(self, rate: float = 0, burst: int = 1, max_in_flight: int = 4):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self.wait_times: Dict[str, float] = defaultdict(float)
+        self._next_token: Dict[str, float] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _reserve(self, host: str, now: float) -> float:
+        """Take a token from the host's bucket and return how long to wait for it.
+
+        Implemented as virtual scheduling: ``_next_token`` is when the bucket would be
+        empty, and a request may start up to ``burst`` tokens ahead of it.
+        """
+        if self.rate <= 0:
+            return 0.0
+        interval = 1.0 / self.rate
+        next_token = max(now, self._next_token.get(host, now))
+        start = max(now, next_token - (self.burst - 1) * interval)
+        self._next_token[host] = next_token + interval
+        return start - now
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        """Wait for an in-flight slot and a token for the URL's host, then run the request."""
+        host = urlsplit(url).hostname or ""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        slot = self._slots.setdefault(host, asyncio.Semaphore(self.max_in_flight))
+        async with slot:
+            delay = self._reserve(host, loop.time())
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.wait_times[host] += loop.time() - started
+            yield
+
+    def reset_stats(self) -> None:
+        """Clear the accumulated per-host wait times."""
+        self.wait_times.clear()
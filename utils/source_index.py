@@ -0,0 +1,83 @@
+"""
+Incrementally maintained facet index over collected articles.
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+from config import PRIORITY_COMPANIES
+from utils.companies import company_tags
+
+
+class SourceIndex:
+    """Groups articles by source, company tag and publish day as they are added.
+
+    Per-source counts and newest publish times are kept up to date on every ``add``, so
+    reports and the orchestrator can query them without regrouping the whole collection.
+    Company tags come from ``utils.companies.company_tags``.
+    """
+
+    def __init__(self, articles: Iterable = (), companies: Iterable[str] = PRIORITY_COMPANIES):
+        self.companies = tuple(companies)
+        self.clear()
+        for article in articles:
+            self.add(article)
+
+    def clear(self) -> None:
+        """Remove all articles from the index."""
+        self._by_source: Dict[str, List] = {}
+        self._newest: Dict[str, datetime] = {}
+        self._by_company: Dict[str, List] = {}
+        self._by_day: Dict[date, List] = {}
+
+    def add(self, article) -> None:
+        """Add one article to every facet."""
+        source = article["source"]
+        self._by_source.setdefault(source, []).append(article)
+
+        published = article.get("published")
+        if published is not None:
+            if source not in self._newest or published > self._newest[source]:
+                self._newest[source] = published
+            self._by_day.setdefault(published.date(), []).append(article)
+
+        for company in self.company_tags(article):
+            self._by_company.setdefault(company, []).append(article)
+
+    def company_tags(self, article) -> List[str]:
+        """Return the companies an article is about, in index order."""
+        return company_tags(article, self.companies)
+
+    def by_source(self) -> Dict[str, List]:
+        """Return articles grouped by source, in order of first appearance."""
+        return dict(self._by_source)
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of articles per source."""
+        return {source: len(articles) for source, articles in self._by_source.items()}
+
+    def count(self, source: str) -> int:
+        """Return the number of articles from a source."""
+        return len(self._by_source.get(source, ()))
+
+    def newest(self, source: str) -> Optional[datetime]:
+        """Return the newest publish time seen for a source, if any."""
+        return self._newest.get(source)
+
+    def by_company(self, company: str) -> List:
+        """Return articles tagged with a company."""
+        return list(self._by_company.get(company, ()))
+
+    def company_counts(self) -> Dict[str, int]:
+        """Return the number of articles per company tag."""
+        return {company: len(articles) for company, articles in self._by_company.items()}
+
+    def by_day(self, day: date) -> List:
+        """Return articles published on a given (UTC) day."""
+        return list(self._by_day.get(day, ()))
+
+    def day_counts(self) -> Dict[date, int]:
+        """Return the number of articles per publish day."""
+        return {day: len(articles) for day, articles in sorted(self._by_day.items())}
+
+    def __len__(self) -> int:
+        return sum(len(articles) for articles in self._by_source.values())
@@ -0,0 +1,36 @@
+"""
+Ingest-time cleanup of feed entry summaries.
+"""
+
+import html
+import re
+
+# One pass over the markup: drop script/style blocks and comments whole, and every other
+# tag becomes a word break. No DOM is built.
+_MARKUP_RE = re.compile(
+    r"<(script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->|<[^>]*>",
+    re.IGNORECASE | re.DOTALL,
+)
+ELLIPSIS = "…"
+
+
+def clean_summary(text, max_chars: int = 500) -> str:
+    """Strip HTML from a feed summary, collapse whitespace and truncate it.
+
+    Args:
+        text: Raw summary as found in the feed (may contain HTML and entities)
+        max_chars: Maximum length of the result; longer text is cut at a word
+            boundary and ends with an ellipsis. 0 disables truncation.
+
+    Returns:
+        Plain text summary, or "" if the input is not a string
+    """
+    if not isinstance(text, str) or not text:
+        return ""
+
+    plain = " ".join(html.unescape(_MARKUP_RE.sub(" ", text)).split())
+    if max_chars and len(plain) > max_chars:
+        cut = plain[: max_chars - len(ELLIPSIS) + 1]
+        space = cut.rfind(" ")
+        plain = (cut[:space] if space > 0 else cut[:-1]).rstrip(" ,.;:") + ELLIPSIS
+    return plain
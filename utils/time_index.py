@@ -0,0 +1,66 @@
+"""
+Time-window index over collected article history.
+"""
+
+import bisect
+import heapq
+import operator
+from typing import Dict, Iterable, List, Optional
+from utils.article import Article
+from utils.dedup import link_fingerprint
+
+_by_timestamp = operator.attrgetter("timestamp")
+
+
+class TimeWindowIndex:
+    """Articles kept in publish-time order, overall and per source.
+
+    Answers "articles since T from sources S" with one bisect per sorted array plus the
+    matching slice, i.e. O(log N + k). Articles are deduplicated by canonical link, so
+    re-collecting the same story does not add it twice.
+    """
+
+    def __init__(self, articles: Iterable[Article] = ()):
+        self._timestamps: Dict[Optional[str], List[int]] = {None: []}
+        self._articles: Dict[Optional[str], List[Article]] = {None: []}
+        self._seen = set()
+        for article in articles:
+            self.add(article)
+
+    def add(self, article: Article) -> bool:
+        """Insert an article in time order. Returns False if its link is already indexed."""
+        fingerprint = link_fingerprint(article.link)
+        if fingerprint in self._seen:
+            return False
+        self._seen.add(fingerprint)
+
+        for key in (None, article.source):
+            timestamps = self._timestamps.setdefault(key, [])
+            articles = self._articles.setdefault(key, [])
+            position = bisect.bisect_right(timestamps, article.timestamp)
+            timestamps.insert(position, article.timestamp)
+            articles.insert(position, article)
+        return True
+
+    def _since(self, key: Optional[str], since: int) -> List[Article]:
+        """Return one array's articles published after ``since``, newest first."""
+        timestamps = self._timestamps.get(key)
+        if not timestamps:
+            return []
+        start = bisect.bisect_right(timestamps, since)
+        return self._articles[key][start:][::-1]
+
+    def query(self, since: int, sources: Optional[Iterable[str]] = None) -> List[Article]:
+        """Return articles published after epoch second ``since``, newest first.
+
+        Args:
+            since: Exclusive lower bound as UTC epoch seconds
+            sources: Only include these sources (all sources if None)
+        """
+        if sources is None:
+            return self._since(None, since)
+        slices = [self._since(source, since) for source in set(sources)]
+        return list(heapq.merge(*slices, key=_by_timestamp, reverse=True))
+
+    def __len__(self) -> int:
+        return len(self._articles[None])
@@ -0,0 +1,50 @@
+"""
+Fast timestamp normalization for feed entries.
+"""
+
+import calendar
+from typing import Optional
+
+# Entry date fields feedparser fills in, in order of preference
+DATE_FIELDS = ("published_parsed", "updated_parsed", "created_parsed")
+# Channel-level date fields used for entries with no date of their own
+CHANNEL_DATE_FIELDS = ("updated_parsed", "published_parsed")
+
+
+def _epoch(value) -> Optional[int]:
+    """Convert a feedparser time tuple (always UTC) to epoch seconds, or None if invalid."""
+    if not isinstance(value, tuple) or len(value) < 6:
+        return None
+    return calendar.timegm(value[:6] + (0, 0, 0))
+
+
+class TimestampNormalizer:
+    """Turns a feed's entries into UTC epoch seconds.
+
+    Detects which date field the feed uses on the first dated entry and tries that field
+    first for every later entry. Entries with no date of their own fall back to the
+    feed-level date (``updated_parsed`` / ``published_parsed`` of the channel).
+    """
+
+    def __init__(self, feed=None, field: Optional[str] = None):
+        self.field = field
+        channel = getattr(feed, "feed", None) if feed is not None else None
+        self.feed_default = None
+        for name in CHANNEL_DATE_FIELDS:
+            self.feed_default = _epoch(getattr(channel, name, None))
+            if self.feed_default is not None:
+                break
+
+    def __call__(self, entry) -> Optional[int]:
+        """Return the entry's timestamp in epoch seconds, or None if nothing usable exists."""
+        if self.field is not None:
+            timestamp = _epoch(getattr(entry, self.field, None))
+            if timestamp is not None:
+                return timestamp
+
+        for name in DATE_FIELDS:
+            timestamp = _epoch(getattr(entry, name, None))
+            if timestamp is not None:
+                self.field = name
+                return timestamp
+        return self.feed_default
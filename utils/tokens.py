@@ -0,0 +1,53 @@
+"""
+Token estimates for AI prompts.
+"""
+
+import math
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Gemini averages roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Approximate token count (characters / CHARS_PER_TOKEN, rounded up)
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def pack(
+    items: Sequence[T],
+    budget: float,
+    cost: Callable[[T], int],
+    limit: Optional[int] = None,
+) -> List[T]:
+    """Greedily select items, in order, whose total cost fits a budget.
+
+    An item that does not fit is skipped and later (cheaper) items are still tried.
+
+    Args:
+        items: Candidates, most important first
+        budget: Maximum total cost
+        cost: Function returning the cost of one item
+        limit: Maximum number of items to select (no limit if None)
+
+    Returns:
+        The selected items, in their original order
+    """
+    selected = []
+    for item in items:
+        if limit is not None and len(selected) >= limit:
+            break
+        item_cost = cost(item)
+        if item_cost <= budget:
+            selected.append(item)
+            budget -= item_cost
+    return selected
@@ -0,0 +1,52 @@
+"""
+Bounded top-K selection of the newest articles.
+"""
+
+import heapq
+import itertools
+from typing import Callable, Dict, List, Optional
+
+
+class TopKSelector:
+    """Keeps the K newest articles seen so far in fixed-size min-heaps.
+
+    Memory is bounded by ``k`` (or ``k`` per source when a per-source quota is set),
+    no matter how many articles are pushed. Ties keep the article pushed first,
+    matching a stable sort.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        per_source: Optional[int] = None,
+        key: Callable[[Dict], object] = lambda article: article["published"],
+    ):
+        self.k = k
+        self.per_source = min(per_source, k) if per_source else None
+        self.key = key
+        self._heaps: Dict[Optional[str], list] = {}
+        self._counter = itertools.count()
+
+    def push(self, article) -> bool:
+        """Offer an article to the selector. Returns True if it is currently kept."""
+        limit = self.per_source or self.k
+        if limit <= 0:
+            return False
+
+        heap = self._heaps.setdefault(article["source"] if self.per_source else None, [])
+        item = (self.key(article), -next(self._counter), article)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+            return True
+        if item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+            return True
+        return False
+
+    def results(self) -> List:
+        """Return the selected articles, newest first."""
+        items = itertools.chain.from_iterable(self._heaps.values())
+        return [item[2] for item in heapq.nlargest(self.k, items, key=lambda item: item[:2])]
+
+    def __len__(self) -> int:
+        return min(self.k, sum(len(heap) for heap in self._heaps.values()))